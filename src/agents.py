@@ -1,15 +1,11 @@
 import logging
 import os
-import random
 from functools import wraps
 
 from communication import CommunicatingAgent, MessagePerformative
 from knowledge_percepts import MAX_CARRY_TIMEOUT, DroneKnowledge, DronePercepts
 from objects import Waste
 
-# Set random seed for reproducibility
-# random.seed(42)
-
 # Set up module-level logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -63,7 +59,7 @@ class Drone(CommunicatingAgent):
         self._setup_logger()
 
         self.logger.info(
-            f"Initializing drone {self.unique_id} with zone type {zone_type}"
+            "Initializing drone %s with zone type %s", self.unique_id, zone_type
         )
 
         # Initialize percepts using the dataclass
@@ -76,6 +72,18 @@ class Drone(CommunicatingAgent):
             zone_type=zone_type,
         )
 
+        # Columns of the drop zone and of this drone's transfer zone, which
+        # never change, None when the transfer zone is the drop zone
+        self._drop_x = self.knowledge.grid_width - 1
+        transfer_x = (zone_type + 1) * (self.knowledge.grid_width // 3) - 1
+        self._transfer_x = transfer_x if transfer_x != self._drop_x else None
+
+        # Color of the wastes this drone produces by transforming, and the bits
+        # of that color and of its own zone color in the inventory colors mask
+        self._processed_color = zone_type + 1
+        self._processed_bit = 1 << self._processed_color
+        self._zone_bit = 1 << zone_type
+
     @cleanup_logger
     def _setup_logger(self):
         """Set up individual logging for this drone"""
@@ -111,32 +119,34 @@ class Drone(CommunicatingAgent):
             self.logger.info("MOVEMENT: No empty neighbors available, staying in place")
             return
 
-        # Get visit counts for neighbors, default to 0 if not visited
-        neighbor_visits = {
-            n_pos: self.knowledge.visited_positions.get(n_pos, 0)
-            for n_pos in self.percepts.neighbors_empty
-        }
-
-        # Find the minimum visit count
-        min_visits = min(neighbor_visits.values())
-
-        # Get all neighbors with the minimum visit count
-        least_visited_neighbors = [
-            n_pos for n_pos, visits in neighbor_visits.items() if visits == min_visits
-        ]
+        # Collect the least visited neighbors in a single pass over the visit
+        # counts, 0 for cells never visited
+        visit_count = self.knowledge.visit_count
+        least_visited_neighbors = []
+        min_visits = None
+        for n_pos in self.percepts.neighbors_empty:
+            visits = visit_count(n_pos)
+            if min_visits is None or visits < min_visits:
+                min_visits = visits
+                least_visited_neighbors = [n_pos]
+            elif visits == min_visits:
+                least_visited_neighbors.append(n_pos)
 
         self.logger.info(
-            f"MOVEMENT: Found {len(least_visited_neighbors)} least visited neighbors (visit count: {min_visits})"
+            "MOVEMENT: Found %d least visited neighbors (visit count: %d)",
+            len(least_visited_neighbors),
+            min_visits,
         )
 
-        # Choose randomly among the least visited neighbors
-        new_position = random.choice(least_visited_neighbors)
+        # Choose randomly among the least visited neighbors, using the model's
+        # seeded generator so that runs are reproducible
+        new_position = self.random.choice(least_visited_neighbors)
 
         if new_position != self.pos:
             # Reset can_pick when moving to a new position
             self.knowledge.can_pick = True
             self.logger.info("SEARCH: Reset can_pick flag after moving")
-            self.logger.info(f"MOVEMENT: Moving from {self.pos} to {new_position}")
+            self.logger.info("MOVEMENT: Moving from %s to %s", self.pos, new_position)
         else:
             self.logger.info("MOVEMENT: Staying in current position")
 
@@ -144,14 +154,11 @@ class Drone(CommunicatingAgent):
         self.model.grid.move_agent(self, new_position)
 
         # Update visit count for the new position
-        previous_visits = self.knowledge.visited_positions.get(self.pos, 0)
-        self.knowledge.visited_positions[self.pos] = previous_visits + 1
+        visits = self.knowledge.record_visit(self.pos)
 
         # Update knowledge about position
-        self.knowledge.actions.append(f"moved to {new_position}")
-        self.logger.info(
-            f"SEARCH: Position {self.pos} now visited {self.knowledge.visited_positions[self.pos]} time(s)"
-        )
+        self.knowledge.last_action = f"moved to {new_position}"
+        self.logger.info("SEARCH: Position %s now visited %d time(s)", self.pos, visits)
 
     def move_east(self):
         """
@@ -159,14 +166,13 @@ class Drone(CommunicatingAgent):
         If no empty positions to the east are available, the drone stays in place.
         Updates the drone's knowledge after moving.
         """
-        # Look for empty positions to the east
-        east_positions = [
-            pos for pos in self.percepts.neighbors_empty if pos[0] > self.pos[0]
-        ]
+        # The only neighbor to the east is the next cell on the same row
+        x, y = self.pos
+        east_position = (x + 1, y)
 
-        # If there are positions to the east, move to the first one; otherwise, stay in place
-        if east_positions:
-            new_position = east_positions[0]
+        # If the east position is empty, move to it; otherwise, stay in place
+        if east_position in self.percepts.neighbors_empty_set:
+            new_position = east_position
         else:
             new_position = self.pos
             self.logger.info("No east positions available, staying in place")
@@ -181,12 +187,10 @@ class Drone(CommunicatingAgent):
         self.model.grid.move_agent(self, new_position)
 
         # Update visit count for the new position
-        self.knowledge.visited_positions[self.pos] = (
-            self.knowledge.visited_positions.get(self.pos, 0) + 1
-        )
+        self.knowledge.record_visit(self.pos)
         # Update knowledge about position
-        self.knowledge.actions.append(f"moved east to {new_position}")
-        self.logger.info(f"Moved east to position {new_position}")
+        self.knowledge.last_action = f"moved east to {new_position}"
+        self.logger.info("Moved east to position %s", new_position)
 
     def step_towards_target(self):
         """
@@ -196,59 +200,57 @@ class Drone(CommunicatingAgent):
         target_x, target_y = target_pos
 
         neighbor_positions = self.percepts.neighbors_empty
+        logger = self.logger
 
         if len(neighbor_positions) == 0:
-            self.logger.info(
-                "MOVEMENT: No empty neighbors available to move towards target"
-            )
+            logger.info("MOVEMENT: No empty neighbors available to move towards target")
             return
 
+        current_x, current_y = self.pos
+
         # Prioritize movement in the x direction first
-        if self.pos[0] != target_x:
-            # Filter neighbors with the closest x-coordinate to the target
-            closest_x_neighbors = [
-                pos for pos in neighbor_positions if pos[0] == target_x
-            ]
-            if closest_x_neighbors:
-                self.logger.info("TARGETING: Aligning x-coordinate with target")
-                new_position = min(
-                    closest_x_neighbors,
-                    key=lambda pos: abs(pos[1] - target_y),
-                )
+        if current_x != target_x:
+            # The neighborhood is von Neumann, so the only neighbor that can lie
+            # on the target column is the cell beside the drone on its own row
+            aligned_position = (target_x, current_y)
+            if aligned_position in self.percepts.neighbors_empty_set:
+                logger.info("TARGETING: Aligning x-coordinate with target")
+                new_position = aligned_position
             else:
                 # If no neighbors match the target x, move closer in x direction
-                self.logger.info("TARGETING: Moving closer in x-direction")
+                logger.info("TARGETING: Moving closer in x-direction")
                 new_position = min(
                     neighbor_positions,
                     key=lambda pos: abs(pos[0] - target_x),
                 )
         else:
             # If x-coordinate is aligned, move in the y direction
-            self.logger.info("TARGETING: X-coordinate aligned, moving in y-direction")
+            logger.info("TARGETING: X-coordinate aligned, moving in y-direction")
             new_position = min(
                 neighbor_positions,
                 key=lambda pos: abs(pos[1] - target_y),
             )
 
-        # Calculate Manhattan distance to target before and after move
-        current_distance = abs(self.pos[0] - target_x) + abs(self.pos[1] - target_y)
-        new_distance = abs(new_position[0] - target_x) + abs(new_position[1] - target_y)
+        if logger.isEnabledFor(logging.INFO):
+            # Calculate Manhattan distance to target before and after move
+            current_distance = abs(current_x - target_x) + abs(current_y - target_y)
+            new_distance = abs(new_position[0] - target_x) + abs(
+                new_position[1] - target_y
+            )
 
-        self.logger.info(f"TARGETING: Moving towards target {target_pos}")
-        self.logger.info(f"MOVEMENT: From {self.pos} to {new_position}")
-        self.logger.info(
-            f"TARGETING: Distance to target: {current_distance} → {new_distance}"
-        )
+            logger.info("TARGETING: Moving towards target %s", target_pos)
+            logger.info("MOVEMENT: From %s to %s", self.pos, new_position)
+            logger.info(
+                "TARGETING: Distance to target: %d → %d", current_distance, new_distance
+            )
 
         # Execute the move
         self.model.grid.move_agent(self, new_position)
 
         # Update visit count for the new position
-        self.knowledge.visited_positions[self.pos] = (
-            self.knowledge.visited_positions.get(self.pos, 0) + 1
-        )
+        self.knowledge.record_visit(self.pos)
 
-        self.knowledge.actions.append(f"moved towards target {target_pos}")
+        self.knowledge.last_action = f"moved towards target {target_pos}"
 
     def pick_waste(self):
         """
@@ -258,8 +260,8 @@ class Drone(CommunicatingAgent):
             bool: True if waste was picked up, False otherwise
         """
         wastes_at_position = [
-            (waste_id, waste_pos)
-            for waste_id, waste_pos in self.percepts.neighbor_wastes
+            (waste_id, waste_pos, waste_color)
+            for waste_id, waste_pos, waste_color in self.percepts.neighbor_wastes
             if waste_pos not in self.knowledge.ignored_waste_positions
             # if waste_pos == self.pos  # Ensure waste is at the current position
         ]
@@ -274,41 +276,49 @@ class Drone(CommunicatingAgent):
 
         # At this point we have waste nearby and inventory space
         self.logger.info(
-            f"COLLECTION: Found {len(wastes_at_position)} waste(s) nearby, checking compatibility"
+            "COLLECTION: Found %s waste(s) nearby, checking compatibility",
+            len(wastes_at_position),
         )
 
         self.knowledge.ignored_waste_positions.clear()
         self.logger.info("COLLECTION: Cleared ignored waste positions")
 
         # Look for compatible waste
-        for waste_id, waste_pos in wastes_at_position:
-            waste = self.model.get_agent_by_id(waste_id)
-            inventory_types = [w.waste_color for w in self.knowledge.inventory]
-
+        if self.logger.isEnabledFor(logging.INFO):
             self.logger.info(
-                f"COLLECTION: Checking waste {waste_id} (color {waste.waste_color}) at {waste_pos}"
+                "COLLECTION: Current inventory colors: %s",
+                format(self.knowledge.inventory_colors, "03b"),
+            )
+        for waste_id, waste_pos, waste_color in wastes_at_position:
+            self.logger.info(
+                "COLLECTION: Checking waste %s (color %s) at %s",
+                waste_id,
+                waste_color,
+                waste_pos,
             )
-            self.logger.info(f"COLLECTION: Current inventory types: {inventory_types}")
 
             # Check if waste type is compatible with current inventory and drone's zone
-            if waste.waste_color == self.knowledge.zone_type and (
-                not inventory_types or waste.waste_color in inventory_types
-            ):
+            if self.knowledge.accepts_waste(waste_color):
+                # Only the waste to pick up needs to be looked up
+                waste = self.model.get_agent_by_id(waste_id)
                 if waste.pos is not None:  # Ensure waste is actually on the grid
-                    original_waste_color = waste.waste_color
+                    original_waste_color = waste_color
                     waste_to_pick = waste.pos
                     self.logger.info(
-                        f"COLLECTION: Waste {waste_id} is compatible, picking up"
+                        "COLLECTION: Waste %s is compatible, picking up", waste_id
                     )
 
                     self.model.grid.remove_agent(waste)  # Remove waste from grid
                     self.knowledge.inventory.append(waste)
+                    self.knowledge.inventory_colors |= 1 << waste_color
 
-                    self.knowledge.actions.append(f"picked waste {waste_id}")
+                    self.knowledge.last_action = f"picked waste {waste_id}"
 
                     # Memory management
                     self.logger.info(
-                        f"COMMUNICATION: Broadcasting removal of waste {waste_id} at {waste_pos}"
+                        "COMMUNICATION: Broadcasting removal of waste %s at %s",
+                        waste_id,
+                        waste_pos,
                     )
                     self.send_broadcast_message(
                         MessagePerformative.INFORM_WASTE_POS_REMOVE_REF,
@@ -320,7 +330,9 @@ class Drone(CommunicatingAgent):
                         (original_waste_color, waste_to_pick)
                     )
                     self.logger.info(
-                        f"MEMORY: Removed waste (color {original_waste_color}) at {waste_to_pick}"
+                        "MEMORY: Removed waste (color %s) at %s",
+                        original_waste_color,
+                        waste_to_pick,
                     )
 
                     # If this was a target waste, reset target
@@ -334,16 +346,20 @@ class Drone(CommunicatingAgent):
                     self.knowledge.can_pick = True
 
                     self.logger.info(
-                        f"INVENTORY: Now carrying {len(self.knowledge.inventory)} item(s)"
+                        "INVENTORY: Now carrying %s item(s)",
+                        len(self.knowledge.inventory),
                     )
                     return True
                 else:
                     self.logger.warning(
-                        f"COLLECTION: Waste {waste_id} has no position, cannot pick up"
+                        "COLLECTION: Waste %s has no position, cannot pick up", waste_id
                     )
             else:
                 self.logger.info(
-                    f"COLLECTION: Waste {waste_id} is incompatible (color {waste.waste_color} != zone {self.knowledge.zone_type})"
+                    "COLLECTION: Waste %s is incompatible (color %s != zone %s)",
+                    waste_id,
+                    waste_color,
+                    self.knowledge.zone_type,
                 )
                 self.knowledge.can_pick = False  # Cannot pick this specific waste
 
@@ -359,20 +375,24 @@ class Drone(CommunicatingAgent):
         """
         # Get the processed waste type from inventory
         processed_waste = self.knowledge.inventory.pop(0)
+        self.knowledge.update_inventory_colors()
 
         # Log waste info before dropping
         self.logger.info(
-            f"DELIVERY: Dropping waste (ID: {processed_waste.unique_id}, color: {processed_waste.waste_color}) at {self.pos}"
+            "DELIVERY: Dropping waste (ID: %s, color: %s) at %s",
+            processed_waste.unique_id,
+            processed_waste.waste_color,
+            self.pos,
         )
 
         # Processed waste should be of the same type as the zone type + 1 or 2
         # or we are in a deadlock situation
         assert (
-            processed_waste.waste_color == self.knowledge.zone_type + 1
+            processed_waste.waste_color == self._processed_color
             or processed_waste.waste_color == 2
             or self.is_deadlocked
         ), (
-            f"Processed waste type {processed_waste.waste_color} does not match zone type {self.knowledge.zone_type + 1}"
+            f"Processed waste type {processed_waste.waste_color} does not match zone type {self._processed_color}"
         )
 
         self.knowledge.carry_timeout = MAX_CARRY_TIMEOUT  # Reset carry timeout
@@ -382,7 +402,10 @@ class Drone(CommunicatingAgent):
 
         # Broadcast to other agents
         self.logger.info(
-            f"COMMUNICATION: Broadcasting new waste (ID: {processed_waste.unique_id}, color: {processed_waste.waste_color}) at {self.pos}"
+            "COMMUNICATION: Broadcasting new waste (ID: %s, color: %s) at %s",
+            processed_waste.unique_id,
+            processed_waste.waste_color,
+            self.pos,
         )
         self.send_broadcast_message(
             MessagePerformative.INFORM_WASTE_POS_ADD_REF,
@@ -390,7 +413,7 @@ class Drone(CommunicatingAgent):
         )
 
         # Update knowledge
-        self.knowledge.actions.append("dropped waste")
+        self.knowledge.last_action = "dropped waste"
 
         # Update movement flags
         self.knowledge.should_move_east = False
@@ -400,7 +423,7 @@ class Drone(CommunicatingAgent):
 
         # Final status update
         self.logger.info(
-            f"INVENTORY: Now carrying {len(self.knowledge.inventory)} items"
+            "INVENTORY: Now carrying %s items", len(self.knowledge.inventory)
         )
 
         return True
@@ -410,111 +433,112 @@ class Drone(CommunicatingAgent):
         Update the drone's knowledge based on its current percepts and state.
         This method is called at the beginning of each step.
         """
+        knowledge = self.knowledge
+        logger = self.logger
+        waste_memory = knowledge.collective_waste_memory
+        zone_type = self.zone_type
+        pos = self.pos
+
         # Initialize current position info
-        self.logger.info(f"Current position: {self.pos}")
+        logger.info("Current position: %s", pos)
 
         # Check carry timeout
         if (
-            len(self.knowledge.inventory) == 1
-            and self.zone_type < 2
-            and self.knowledge.inventory[0].waste_color == self.zone_type
-            and self.knowledge.carry_timeout > 0
+            len(knowledge.inventory) == 1
+            and zone_type < 2
+            and knowledge.inventory_colors == self._zone_bit
+            and knowledge.carry_timeout > 0
         ):
-            self.knowledge.carry_timeout -= 1
-            self.logger.info(
-                f"TIMEOUT: Carry timeout decremented to {self.knowledge.carry_timeout}"
+            knowledge.carry_timeout -= 1
+            logger.info(
+                "TIMEOUT: Carry timeout decremented to %s", knowledge.carry_timeout
             )
 
         # Process mailbox messages
         new_messages = self.get_new_messages()
         if new_messages:
-            self.logger.info(f"MAILBOX: Received {len(new_messages)} messages")
+            logger.info("MAILBOX: Received %s messages", len(new_messages))
         else:
-            self.logger.info("MAILBOX: No new messages")
+            logger.info("MAILBOX: No new messages")
 
         self._check_deadlock()
 
         # Process and broadcast nearby wastes
-        wastes_to_process = [
-            set(self.percepts.neighbor_wastes) - self.knowledge.ignored_waste_positions
-        ]
-        waste_count = len(wastes_to_process)
-        if waste_count > 0:
-            self.logger.info(f"PERCEPTION: Detected {waste_count} waste(s) nearby")
-            for waste_id, waste_pos in self.percepts.neighbor_wastes:
-                waste = self.model.get_agent_by_id(waste_id)
-                self.logger.info(
-                    f"COMMUNICATION: Broadcasting waste {waste_id} (color {waste.waste_color}) at {waste_pos}"
+        neighbor_wastes = self.percepts.neighbor_wastes
+        if neighbor_wastes:
+            logger.info("PERCEPTION: Detected %s waste(s) nearby", len(neighbor_wastes))
+            for waste_id, waste_pos, waste_color in neighbor_wastes:
+                logger.info(
+                    "COMMUNICATION: Broadcasting waste %s (color %s) at %s",
+                    waste_id,
+                    waste_color,
+                    waste_pos,
                 )
                 self.send_broadcast_message(
                     MessagePerformative.INFORM_WASTE_POS_ADD_REF,
-                    (waste.waste_color, waste_pos),
+                    (waste_color, waste_pos),
                 )
                 # Add to own collective memory if not already present
-                self.knowledge.collective_waste_memory.add(
-                    (waste.waste_color, waste_pos)
-                )
+                waste_memory.add((waste_color, waste_pos))
         else:
-            self.logger.info("PERCEPTION: No waste detected nearby")
-
-        # Process received messages by type
-        add_waste_messages = [
-            m
-            for m in new_messages
-            if m.get_performative() == MessagePerformative.INFORM_WASTE_POS_ADD_REF
-        ]
-        delete_waste_messages = [
-            m
-            for m in new_messages
-            if m.get_performative() == MessagePerformative.INFORM_WASTE_POS_REMOVE_REF
-        ]
+            logger.info("PERCEPTION: No waste detected nearby")
+
+        # Process received messages by type, sorted in a single pass
+        add_waste_messages = []
+        delete_waste_messages = []
+        for m in new_messages:
+            performative = m.get_performative()
+            if performative == MessagePerformative.INFORM_WASTE_POS_ADD_REF:
+                add_waste_messages.append(m)
+            elif performative == MessagePerformative.INFORM_WASTE_POS_REMOVE_REF:
+                delete_waste_messages.append(m)
 
         # Update collective memory from ADD messages
         if add_waste_messages:
-            self.logger.info(
-                f"MEMORY: Processing {len(add_waste_messages)} ADD_WASTE messages"
+            logger.info(
+                "MEMORY: Processing %s ADD_WASTE messages", len(add_waste_messages)
             )
             for message in add_waste_messages:
                 waste_color, waste_pos = message.get_content()
-                self.knowledge.collective_waste_memory.add((waste_color, waste_pos))
-                self.logger.info(
-                    f"MEMORY: Added waste (color {waste_color}) at {waste_pos}"
+                waste_memory.add((waste_color, waste_pos))
+                logger.info(
+                    "MEMORY: Added waste (color %s) at %s", waste_color, waste_pos
                 )
 
         # Update collective memory from DELETE messages
         if delete_waste_messages:
-            self.logger.info(
-                f"MEMORY: Processing {len(delete_waste_messages)} DELETE_WASTE messages"
+            logger.info(
+                "MEMORY: Processing %s DELETE_WASTE messages",
+                len(delete_waste_messages),
             )
             for message in delete_waste_messages:
                 waste_color, waste_pos = message.get_content()
-                self.knowledge.collective_waste_memory.discard((waste_color, waste_pos))
-                self.logger.info(
-                    f"MEMORY: Removed waste (color {waste_color}) at {waste_pos}"
+                waste_memory.discard((waste_color, waste_pos))
+                logger.info(
+                    "MEMORY: Removed waste (color %s) at %s", waste_color, waste_pos
                 )
 
         # Target assignment logic
+        drop_x = self._drop_x
         compatible_wastes = [
-            wp
-            for wp in self.knowledge.collective_waste_memory
-            if wp[0] == self.zone_type and not self.in_drop_zone(wp[1])
+            wp for wp in waste_memory if wp[0] == zone_type and wp[1][0] != drop_x
         ]
 
-        self.logger.info(f"MEMORY: Known compatible wastes: {len(compatible_wastes)}")
+        logger.info("MEMORY: Known compatible wastes: %s", len(compatible_wastes))
 
-        if compatible_wastes and not self.knowledge.target_pos:
+        if compatible_wastes and not knowledge.target_pos:
             # Assign closest waste as target
             closest_waste = min(
                 compatible_wastes,
-                key=lambda wp: (
-                    abs(wp[1][0] - self.pos[0]) + abs(wp[1][1] - self.pos[1])
-                ),
+                key=lambda wp: abs(wp[1][0] - pos[0]) + abs(wp[1][1] - pos[1]),
             )
 
-            if closest_waste[1] not in self.knowledge.ignored_waste_positions:
-                self.knowledge.target_pos = closest_waste[1]
-                self.logger.info(
-                    f"TARGETING: Assigned new target at {self.knowledge.target_pos} (color {closest_waste[0]})"
+            if closest_waste[1] not in knowledge.ignored_waste_positions:
+                knowledge.target_pos = closest_waste[1]
+                logger.info(
+                    "TARGETING: Assigned new target at %s (color %s)",
+                    knowledge.target_pos,
+                    closest_waste[0],
                 )
 
                 # Remove from collective memory of other agents
@@ -522,73 +546,67 @@ class Drone(CommunicatingAgent):
                     MessagePerformative.INFORM_WASTE_POS_REMOVE_REF,
                     (closest_waste[0], closest_waste[1]),
                 )
-                self.logger.info(
-                    f"TARGETING Removed target waste (color {closest_waste[0]}, pos {closest_waste[1]}) "
-                    "from collective memory of other agents"
+                logger.info(
+                    "TARGETING Removed target waste (color %s, pos %s) "
+                    "from collective memory of other agents",
+                    closest_waste[0],
+                    closest_waste[1],
                 )
 
-        elif not self.knowledge.collective_waste_memory:
-            self.logger.info("TARGETING: No waste in memory, entering search mode")
-            self.knowledge.target_pos = None
-        elif self.knowledge.target_pos:
-            self.logger.info(
-                f"TARGETING: Maintaining current target at {self.knowledge.target_pos}"
+        elif not waste_memory:
+            logger.info("TARGETING: No waste in memory, entering search mode")
+            knowledge.target_pos = None
+        elif knowledge.target_pos:
+            logger.info(
+                "TARGETING: Maintaining current target at %s", knowledge.target_pos
             )
 
-        # Store percepts in history
-        self.knowledge.percepts.append(self.percepts)
-
         # Zone position checks
-        is_transfer_zone = (
-            self.pos[0]
-            == (self.knowledge.zone_type + 1) * (self.knowledge.grid_width // 3) - 1
-            and self.pos[0] != self.knowledge.grid_width - 1
-            and self.knowledge.zone_type < 2
-        )
-        is_drop_zone = (
-            self.pos[0] == self.knowledge.grid_width - 1
-            and self.knowledge.zone_type == 2
-        )
+        x = pos[0]
+        is_transfer_zone = x == self._transfer_x and zone_type < 2
+        is_drop_zone = x == drop_x and zone_type == 2
 
         # Update zone knowledge
-        self.knowledge.in_transfer_zone = is_transfer_zone
-        self.knowledge.in_drop_zone = is_drop_zone
+        knowledge.in_transfer_zone = is_transfer_zone
+        knowledge.in_drop_zone = is_drop_zone
 
         if is_transfer_zone:
-            self.logger.info("POSITION: Currently in transfer zone")
+            logger.info("POSITION: Currently in transfer zone")
         if is_drop_zone:
-            self.logger.info("POSITION: Currently in drop zone")
+            logger.info("POSITION: Currently in drop zone")
 
         # Special movement rules
-        if self.knowledge.in_transfer_zone or self.knowledge.in_drop_zone:
-            self.knowledge.should_move_east = False
-            self.logger.info(
-                "MOVEMENT: In special zone, setting should_move_east=False"
-            )
-        elif self.knowledge.zone_type == 2 and len(self.knowledge.inventory) > 0:
-            self.knowledge.should_move_east = True
-            self.logger.info(
+        if knowledge.in_transfer_zone or knowledge.in_drop_zone:
+            knowledge.should_move_east = False
+            logger.info("MOVEMENT: In special zone, setting should_move_east=False")
+        elif zone_type == 2 and len(knowledge.inventory) > 0:
+            knowledge.should_move_east = True
+            logger.info(
                 "MOVEMENT: Red zone drone with inventory, setting should_move_east=True"
             )
 
         # Log inventory state
-        if self.knowledge.inventory:
-            inventory_types = [w.waste_color for w in self.knowledge.inventory]
-            self.logger.info(
-                f"INVENTORY: Carrying {len(self.knowledge.inventory)} item(s) of type(s) {inventory_types}"
-            )
+        if knowledge.inventory:
+            if logger.isEnabledFor(logging.INFO):
+                inventory_types = [w.waste_color for w in knowledge.inventory]
+                logger.info(
+                    "INVENTORY: Carrying %s item(s) of type(s) %s",
+                    len(knowledge.inventory),
+                    inventory_types,
+                )
         else:
-            self.logger.info("INVENTORY: Empty")
+            logger.info("INVENTORY: Empty")
 
         # Final memory state summary
-        self.logger.info(
-            f"MEMORY: Total items in collective memory: {len(self.knowledge.collective_waste_memory)}"
+        logger.info(
+            "MEMORY: Total items in collective memory: %s",
+            len(waste_memory),
         )
 
         # If reached target reset ignored waste positions
-        if self.knowledge.target_pos and self.knowledge.target_pos == self.pos:
-            self.knowledge.ignored_waste_positions.clear()
-            self.logger.info(
+        if knowledge.target_pos and knowledge.target_pos == pos:
+            knowledge.ignored_waste_positions.clear()
+            logger.info(
                 "TARGETING: Reset ignored waste positions after reaching target"
             )
 
@@ -598,13 +616,17 @@ class Drone(CommunicatingAgent):
         The processed waste type is one level higher than the zone type.
         """
         # Store information about what we're transforming for logging
-        inventory_count = len(self.knowledge.inventory)
-        waste_types = [w.waste_color for w in self.knowledge.inventory]
-        waste_ids = [w.unique_id for w in self.knowledge.inventory]
+        if self.logger.isEnabledFor(logging.INFO):
+            inventory_count = len(self.knowledge.inventory)
+            waste_types = [w.waste_color for w in self.knowledge.inventory]
+            waste_ids = [w.unique_id for w in self.knowledge.inventory]
 
-        self.logger.info(
-            f"TRANSFORM: Processing {inventory_count} waste items (IDs: {waste_ids}, types: {waste_types})"
-        )
+            self.logger.info(
+                "TRANSFORM: Processing %s waste items (IDs: %s, types: %s)",
+                inventory_count,
+                waste_ids,
+                waste_types,
+            )
 
         # Clear the inventory and delete old wastes
         for waste in self.knowledge.inventory:
@@ -612,11 +634,14 @@ class Drone(CommunicatingAgent):
         self.knowledge.inventory = []
 
         # Create one processed waste item and add it to inventory
-        processed_waste = Waste(self.model, self.knowledge.zone_type + 1)
+        processed_waste = Waste(self.model, self._processed_color)
         self.knowledge.inventory.append(processed_waste)
+        self.knowledge.inventory_colors = self._processed_bit
 
         self.logger.info(
-            f"TRANSFORM: Created new waste (ID: {processed_waste.unique_id}, type: {processed_waste.waste_color})"
+            "TRANSFORM: Created new waste (ID: %s, type: %s)",
+            processed_waste.unique_id,
+            processed_waste.waste_color,
         )
 
         # Move east after transforming
@@ -626,12 +651,14 @@ class Drone(CommunicatingAgent):
         )
 
         # Log the transformation action
-        self.knowledge.actions.append("transformed waste")
+        self.knowledge.last_action = "transformed waste"
         self.logger.info(
-            f"ACTION: Transformed {inventory_count} waste items into type {processed_waste.waste_color}"
+            "ACTION: Transformed %s waste items into type %s",
+            inventory_count,
+            processed_waste.waste_color,
         )
         self.logger.info(
-            f"INVENTORY: Now carrying 1 item of type {processed_waste.waste_color}"
+            "INVENTORY: Now carrying 1 item of type %s", processed_waste.waste_color
         )
 
     def deliberate(self):
@@ -645,134 +672,131 @@ class Drone(CommunicatingAgent):
         5. Move to targeted waste
         6. Search by moving randomly
         """
-        # Log knowledge information
-        self.logger.info("============DELIBERATION STEP=============")
-        self.logger.info(f"\tKnowledge: {self.knowledge}")
-        self.logger.info(f"\tPosition: {self.pos}")
-        self.logger.info("==========================================")
+        knowledge = self.knowledge
+        logger = self.logger
+        pos = self.pos
+        inventory = knowledge.inventory
+        zone_type = knowledge.zone_type
+
+        # Log knowledge information, formatting the whole knowledge is costly
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("============DELIBERATION STEP=============")
+            logger.info("\tKnowledge: %s", knowledge)
+            logger.info("\tPosition: %s", pos)
+            logger.info("==========================================")
 
         # Deadlock situation
         if self.is_deadlocked:
-            self.logger.info("DELIBERATION: Deadlock situation detected")
-            self.knowledge.target_pos = (
+            logger.info("DELIBERATION: Deadlock situation detected")
+            knowledge.target_pos = (
                 0,
                 0,
                 # random.randint(self.knowledge.grid_width) // (3 - self.zone_type),
                 # random.randint(self.knowledge.grid_height),
             )
-            self.knowledge.ignored_waste_positions.add(self.pos)
+            knowledge.ignored_waste_positions.add(pos)
             return "drop_waste"
 
         # PRIORITY 1: DELIVERY - Check if we can drop waste in transfer zone or drop zone
+        inventory_colors = knowledge.inventory_colors
         can_drop = (
-            self.knowledge.in_transfer_zone
-            and self.knowledge.zone_type < 2
-            and self.knowledge.inventory
-            and any(
-                waste.waste_color == self.knowledge.zone_type + 1
-                for waste in self.knowledge.inventory
-            )
+            knowledge.in_transfer_zone
+            and zone_type < 2
+            and inventory_colors & self._processed_bit
         ) or (
-            self.knowledge.in_drop_zone
-            and self.knowledge.inventory
-            and all(waste.waste_color == 2 for waste in self.knowledge.inventory)
+            # Only red wastes in the inventory
+            knowledge.in_drop_zone and inventory_colors == 1 << 2
         )
 
         if can_drop:
-            self.logger.info(
-                f"DELIVERY STAGE: Dropping waste in {'transfer' if self.knowledge.in_transfer_zone else 'drop'} zone"
+            logger.info(
+                "DELIVERY STAGE: Dropping waste in %s zone",
+                "transfer" if knowledge.in_transfer_zone else "drop",
             )
             return "drop_waste"
 
         # PRIORITY 2: PROCESSING - Transform collected waste when inventory is full
-        if (
-            self.knowledge.inventory
-            and len(self.knowledge.inventory) == 2
-            and self.knowledge.zone_type < 2
-        ):
-            self.logger.info(
+        if len(inventory) == 2 and zone_type < 2:
+            logger.info(
                 "PROCESSING STAGE: Have 2 wastes in inventory, need to transform"
             )
             return "transform_waste"
 
         # PRIORITY 3: DELIVERY MOVEMENT - Move east with processed waste
-        if self.knowledge.should_move_east and self.knowledge.inventory:
-            self.logger.info("DELIVERY STAGE: Moving east with processed waste")
+        if knowledge.should_move_east and inventory:
+            logger.info("DELIVERY STAGE: Moving east with processed waste")
             return "move_east"
 
         # PRIORITY 4: COLLECTION - Pick waste if nearby and compatible
+        neighbor_wastes = self.percepts.neighbor_wastes
+        drop_x = self._drop_x
         can_pick = (
-            len(self.knowledge.inventory) < 2
-            and self.percepts.neighbor_wastes
-            and self.knowledge.can_pick
-            and any(
-                not self.in_drop_zone(waste_pos)
-                for _, waste_pos in self.percepts.neighbor_wastes
-            )
+            len(inventory) < 2
+            and neighbor_wastes
+            and knowledge.can_pick
+            and any(waste_pos[0] != drop_x for _, waste_pos, _ in neighbor_wastes)
         )
 
         if can_pick:
             # Check for compatible wastes nearby
-            for waste_id, waste_pos in self.percepts.neighbor_wastes:
-                waste = self.model.get_agent_by_id(waste_id)
-                inventory_types = [w.waste_color for w in self.knowledge.inventory]
-
+            ignored_waste_positions = knowledge.ignored_waste_positions
+            accepts_waste = knowledge.accepts_waste
+            for _, waste_pos, waste_color in neighbor_wastes:
                 # Check if waste is compatible with current inventory and drone type
                 if (
-                    waste.waste_color == self.knowledge.zone_type
-                    and (not inventory_types or waste.waste_color in inventory_types)
-                    and waste.pos not in self.knowledge.ignored_waste_positions
+                    accepts_waste(waste_color)
+                    and waste_pos not in ignored_waste_positions
                 ):
-                    self.logger.info(
-                        f"COLLECTION STAGE: Found compatible waste nearby at {waste_pos}"
+                    logger.info(
+                        "COLLECTION STAGE: Found compatible waste nearby at %s",
+                        waste_pos,
                     )
                     return "pick_waste"
                 else:
-                    self.logger.info(
-                        f"COLLECTION STAGE: Waste at {waste_pos} is incompatible (color {waste.waste_color})"
+                    logger.info(
+                        "COLLECTION STAGE: Waste at %s is incompatible (color %d)",
+                        waste_pos,
+                        waste_color,
                     )
 
         # PRIORITY 5: TARGETED COLLECTION - Move towards target waste
-        if self.knowledge.target_pos:
+        target_pos = knowledge.target_pos
+        if target_pos:
             # Check if we've reached our target
-            if (
-                abs(self.pos[0] - self.knowledge.target_pos[0]) == 0
-                and abs(self.pos[1] - self.knowledge.target_pos[1]) == 0
-            ):
-                self.logger.info("COLLECTION STAGE: Reached target waste position")
-                self.knowledge.target_pos = None
+            if pos == target_pos:
+                logger.info("COLLECTION STAGE: Reached target waste position")
+                knowledge.target_pos = None
 
                 # Discard from collective memory
-                self.knowledge.collective_waste_memory.discard(
-                    (self.knowledge.zone_type, self.pos)
-                )
-                self.logger.info(
-                    f"Removed target waste {self.knowledge.zone_type} at {self.pos} from collective memory"
+                knowledge.collective_waste_memory.discard((zone_type, pos))
+                logger.info(
+                    "Removed target waste %d at %s from collective memory",
+                    zone_type,
+                    pos,
                 )
 
                 # Check if we can pick waste here (reuse logic from above)
                 if can_pick:
                     return "pick_waste"
             else:
-                # Verify target still exists in collective memory
-                target_exists = any(
-                    waste_pos == self.knowledge.target_pos
-                    for _, waste_pos in self.knowledge.collective_waste_memory
-                )
+                # Verify target still exists in collective memory, probing
+                # each waste color at the target position
+                memory = knowledge.collective_waste_memory
+                target_exists = any((color, target_pos) in memory for color in range(3))
 
                 if not target_exists:
-                    self.logger.info(
+                    logger.info(
                         "COLLECTION STAGE: Target waste no longer exists in memory, resetting target"
                     )
-                    self.knowledge.target_pos = None
+                    knowledge.target_pos = None
                 else:
-                    self.logger.info(
-                        f"COLLECTION STAGE: Moving towards target at {self.knowledge.target_pos}"
+                    logger.info(
+                        "COLLECTION STAGE: Moving towards target at %s", target_pos
                     )
                     return "step_towards_target"
 
         # PRIORITY 6: SEARCH - No specific task, search by moving randomly
-        self.logger.info(
+        logger.info(
             "SEARCH STAGE: No waste found or targeted, moving randomly to search"
         )
         return "move_randomly"
@@ -786,7 +810,9 @@ class Drone(CommunicatingAgent):
         """
         self.logger.info("======== STEP BEGIN ========")
         self.logger.info(
-            f"Position: {self.pos} | Inventory: {len(self.knowledge.inventory)} items"
+            "Position: %s | Inventory: %s items",
+            self.pos,
+            len(self.knowledge.inventory),
         )
 
         # Update phase
@@ -798,30 +824,24 @@ class Drone(CommunicatingAgent):
         action = self.deliberate()
 
         # Action phase
-        self.logger.info(f"--- ACTION PHASE: {action.upper()} ---")
+        self.logger.info("--- ACTION PHASE: %s ---", action.upper())
         percept_dict = self.model.do(self, action)
-        self.percepts = DronePercepts(**percept_dict)
+        self.percepts.refresh(**percept_dict)
 
         self.logger.info(
-            f"Step complete | Position: {self.pos} | Inventory: {len(self.knowledge.inventory)} items"
+            "Step complete | Position: %s | Inventory: %s items",
+            self.pos,
+            len(self.knowledge.inventory),
         )
         self.logger.info("======== STEP END ========\n")
 
     def in_drop_zone(self, pos):
         """Check if the position is in the drop zone."""
-        if pos[0] == self.knowledge.grid_width - 1:
-            return True
-        return False
+        return pos[0] == self._drop_x
 
     def in_transfer_zone(self, pos):
         """Check if the position is in the transfer zone."""
-        if (
-            pos[0]
-            == (self.knowledge.zone_type + 1) * (self.knowledge.grid_width // 3) - 1
-            and pos[0] != self.knowledge.grid_width - 1
-        ):
-            return True
-        return False
+        return pos[0] == self._transfer_x
 
     def _check_deadlock(self):
         # ================ DEADLOCK CHECK ================
@@ -829,7 +849,7 @@ class Drone(CommunicatingAgent):
             self.knowledge.carry_timeout <= 0
             and self.zone_type < 2
             and len(self.knowledge.inventory) == 1
-            and self.knowledge.inventory[0].waste_color == self.knowledge.zone_type
+            and self.knowledge.inventory_colors == self._zone_bit
         )
 
         if not self.is_deadlocked:
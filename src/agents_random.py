@@ -1,6 +1,5 @@
 import logging
 import os
-import random
 
 from mesa import Agent
 
@@ -50,8 +49,20 @@ class Drone(Agent):
             zone_type=self.zone_type,
         )
 
+        # Columns of the drop zone and of this drone's transfer zone, which
+        # never change, None when the transfer zone is the drop zone
+        self._drop_x = self.knowledge.grid_width - 1
+        transfer_x = (zone_type + 1) * (self.knowledge.grid_width // 3) - 1
+        self._transfer_x = transfer_x if transfer_x != self._drop_x else None
+
+        # Color of the wastes this drone produces by transforming, and the bits
+        # of that color and of its own zone color in the inventory colors mask
+        self._processed_color = zone_type + 1
+        self._processed_bit = 1 << self._processed_color
+        self._zone_bit = 1 << zone_type
+
         self.logger.info(
-            f"Initializing drone {self.unique_id} with zone type {zone_type}"
+            "Initializing drone %s with zone type %s", self.unique_id, zone_type
         )
 
     def _setup_logger(self):
@@ -90,7 +101,8 @@ class Drone(Agent):
         Updates the drone's knowledge after moving.
         """
         # Choose a new position randomly from available empty neighbors or stay in place
-        new_position = random.choice(
+        # (the model's seeded generator keeps runs reproducible)
+        new_position = self.random.choice(
             (
                 self.percepts.neighbors_empty
                 if len(self.percepts.neighbors_empty) > 0
@@ -108,8 +120,8 @@ class Drone(Agent):
         self.model.grid.move_agent(self, new_position)
 
         # Update knowledge about position
-        self.knowledge.actions.append(f"moved to {new_position}")
-        self.logger.info(f"Moved to position {new_position}")
+        self.knowledge.last_action = f"moved to {new_position}"
+        self.logger.info("Moved to position %s", new_position)
 
     def move_east(self):
         """
@@ -117,14 +129,13 @@ class Drone(Agent):
         If no empty positions to the east are available, the drone stays in place.
         Updates the drone's knowledge after moving.
         """
-        # Look for empty positions to the east
-        east_positions = [
-            pos for pos in self.percepts.neighbors_empty if pos[0] > self.pos[0]
-        ]
-
-        # If there are positions to the east, move to the first one; otherwise, stay in place
-        if east_positions:
-            new_position = east_positions[0]
+        # The only neighbor to the east is the next cell on the same row
+        x, y = self.pos
+        east_position = (x + 1, y)
+
+        # If the east position is empty, move to it; otherwise, stay in place
+        if east_position in self.percepts.neighbors_empty_set:
+            new_position = east_position
         else:
             new_position = self.pos
             self.logger.info("No east positions available, staying in place")
@@ -139,8 +150,8 @@ class Drone(Agent):
         self.model.grid.move_agent(self, new_position)
 
         # Update knowledge about position
-        self.knowledge.actions.append(f"moved east to {new_position}")
-        self.logger.info(f"Moved east to position {new_position}")
+        self.knowledge.last_action = f"moved east to {new_position}"
+        self.logger.info("Moved east to position %s", new_position)
 
     def pick_waste(self):
         """
@@ -148,40 +159,36 @@ class Drone(Agent):
         Returns:
             bool: True if waste was picked up, False otherwise
         """
-        wastes_at_position = [
-            (waste_id, waste_pos)
-            for waste_id, waste_pos in self.percepts.neighbor_wastes
-        ]
+        wastes_at_position = self.percepts.neighbor_wastes
 
         # Check if there are any wastes at the drone's current position and if there is space in the inventory
         if wastes_at_position and len(self.knowledge.inventory) < 2:
-            waste_id, _ = wastes_at_position[0]
-            waste = self.model.get_agent_by_id(waste_id)
-            self.logger.info(f"Found waste {waste_id}")
+            waste_id, _, waste_color = wastes_at_position[0]
+            self.logger.info("Found waste %s", waste_id)
 
             # Check if waste type is compatible with current inventory
-            inventory_types = [w.waste_color for w in self.knowledge.inventory]
-            if (
-                not inventory_types or waste.waste_color in inventory_types
-            ) and waste.waste_color == self.knowledge.zone_type:
+            if self.knowledge.accepts_waste(waste_color):
+                # Only the waste to pick up needs to be looked up
+                waste = self.model.get_agent_by_id(waste_id)
                 if waste.pos is not None:
                     self.model.grid.remove_agent(waste)
                     self.knowledge.inventory.append(waste)
+                    self.knowledge.inventory_colors |= 1 << waste.waste_color
                 else:
                     self.logger.warning(
-                        f"Waste {waste_id} has no position, cannot pick up"
+                        "Waste %s has no position, cannot pick up", waste_id
                     )
                     return False
 
-                self.knowledge.actions.append(f"picked waste {waste_id}")
-                self.logger.info(f"Picked waste {waste.unique_id}")
+                self.knowledge.last_action = f"picked waste {waste_id}"
+                self.logger.info("Picked waste %s", waste.unique_id)
                 self.logger.info(
-                    f"Now carrying {len(self.knowledge.inventory)} items in inventory"
+                    "Now carrying %s items in inventory", len(self.knowledge.inventory)
                 )
                 return True
             else:
                 self.knowledge.can_pick = False
-                self.logger.info(f"Cannot pick waste {waste_id} - incompatible type")
+                self.logger.info("Cannot pick waste %s - incompatible type", waste_id)
 
         self.logger.info("Did not pick any waste")
         return False
@@ -194,14 +201,15 @@ class Drone(Agent):
         """
         # Get the processed waste type from inventory
         processed_waste = self.knowledge.inventory.pop(0)
+        self.knowledge.update_inventory_colors()
 
         # Create a new waste object with the same type
         self.model.grid.place_agent(processed_waste, self.pos)
 
-        self.knowledge.actions.append("dropped waste")
-        self.logger.info(f"Dropped waste at {self.pos}")
+        self.knowledge.last_action = "dropped waste"
+        self.logger.info("Dropped waste at %s", self.pos)
         self.logger.info(
-            f"Inventory now contains {len(self.knowledge.inventory)} items"
+            "Inventory now contains %s items", len(self.knowledge.inventory)
         )
 
         # Don't move east after dropping waste
@@ -215,32 +223,26 @@ class Drone(Agent):
         Update the drone's knowledge based on its current percepts and state.
         This method is called at the beginning of each step.
         """
-        # Store current percepts in knowledge history
-        self.knowledge.percepts.append(self.percepts)
-        # Reset actions for the new step
-        self.knowledge.actions = []
+        # Reset the last action for the new step
+        self.knowledge.last_action = None
 
-        self.logger.info(f"Starting update at position {self.pos}")
+        self.logger.info("Starting update at position %s", self.pos)
 
         # Log percepts information
-        self.logger.debug(f"Empty neighbors: {len(self.percepts.neighbors_empty)}")
-        self.logger.debug(f"Neighboring zones: {len(self.percepts.neighbor_zones)}")
-        self.logger.debug(f"Neighboring drones: {len(self.percepts.neighbor_drones)}")
-        self.logger.debug(f"Neighboring wastes: {len(self.percepts.neighbor_wastes)}")
+        self.logger.debug("Empty neighbors: %s", len(self.percepts.neighbors_empty))
+        self.logger.debug("Neighboring zones: %s", len(self.percepts.neighbor_zones))
+        self.logger.debug("Neighboring drones: %s", len(self.percepts.neighbor_drones))
+        self.logger.debug("Neighboring wastes: %s", len(self.percepts.neighbor_wastes))
 
         # Update transfer zone status based on current position
         # Check if the drone is in a transfer zone (boundary between zones)
-        is_transfer_zone = (
-            self.pos[0]
-            == (self.knowledge.zone_type + 1) * (self.knowledge.grid_width // 3) - 1
-            and self.pos[0] != self.knowledge.grid_width - 1
-        )
+        is_transfer_zone = self.pos[0] == self._transfer_x
 
         self.knowledge.in_transfer_zone = is_transfer_zone
         if is_transfer_zone:
             self.logger.info("Currently in transfer zone")
 
-        is_drop_zone = self.pos[0] == self.knowledge.grid_width - 1
+        is_drop_zone = self.pos[0] == self._drop_x
         self.knowledge.in_drop_zone = is_drop_zone
         if is_drop_zone:
             self.logger.info("Currently in drop zone")
@@ -251,8 +253,10 @@ class Drone(Agent):
         The processed waste type is one level higher than the zone type.
         """
         # Store information about what we're transforming for logging
-        inventory_count = len(self.knowledge.inventory)
-        waste_types = [w.waste_color for w in self.knowledge.inventory]
+        log_transform = self.logger.isEnabledFor(logging.INFO)
+        if log_transform:
+            inventory_count = len(self.knowledge.inventory)
+            waste_types = [w.waste_color for w in self.knowledge.inventory]
 
         # Clear the inventory
         for waste in self.knowledge.inventory:
@@ -260,18 +264,23 @@ class Drone(Agent):
         self.knowledge.inventory = []
 
         # Create one processed waste item and add it to inventory
-        processed_waste = Waste(self.model, self.knowledge.zone_type + 1)
+        processed_waste = Waste(self.model, self._processed_color)
         self.knowledge.inventory.append(processed_waste)
+        self.knowledge.inventory_colors = self._processed_bit
 
         # Move east after transforming
         self.knowledge.should_move_east = True
         self.logger.info("Set should_move_east flag after transforming")
 
         # Log the transformation action
-        self.knowledge.actions.append("transformed waste")
-        self.logger.info(
-            f"Transformed {inventory_count} waste items of types {waste_types} into type {processed_waste.waste_color}"
-        )
+        self.knowledge.last_action = "transformed waste"
+        if log_transform:
+            self.logger.info(
+                "Transformed %s waste items of types %s into type %s",
+                inventory_count,
+                waste_types,
+                processed_waste.waste_color,
+            )
 
     def deliberate(self):
         """
@@ -280,16 +289,18 @@ class Drone(Agent):
         Returns:
             str: The action to take ("transform_waste", "drop_waste", "pick_waste", "move_east", or "move")
         """
-        self.logger.info("============DELEBIRATION=============")
-        self.logger.info("Deliberating on next action")
-        self.logger.info(f"Current inventory: {self.knowledge.inventory}")
-        self.logger.info(f"Can pick waste: {self.knowledge.can_pick}")
-        self.logger.info(f"Should move east: {self.knowledge.should_move_east}")
-        self.logger.info(f"transfer zone status: {self.knowledge.in_transfer_zone}")
-        self.logger.info(f"drop zone status: {self.knowledge.in_drop_zone}")
-        self.logger.info(f"Zone type: {self.knowledge.zone_type}")
-        self.logger.info(f"Position: {self.pos}")
-        self.logger.info("=====================================")
+        logger = self.logger
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("============DELEBIRATION=============")
+            logger.info("Deliberating on next action")
+            logger.info("Current inventory: %s", self.knowledge.inventory)
+            logger.info("Can pick waste: %s", self.knowledge.can_pick)
+            logger.info("Should move east: %s", self.knowledge.should_move_east)
+            logger.info("transfer zone status: %s", self.knowledge.in_transfer_zone)
+            logger.info("drop zone status: %s", self.knowledge.in_drop_zone)
+            logger.info("Zone type: %s", self.knowledge.zone_type)
+            logger.info("Position: %s", self.pos)
+            logger.info("=====================================")
 
         # Priority 0: Transform if we are green robot or yellow robot and at max capacity
         if len(self.knowledge.inventory) == 2 and self.knowledge.zone_type < 2:
@@ -307,10 +318,7 @@ class Drone(Agent):
             self.logger.info("In transfer zone with waste")
 
             # Check if waste is of the correct processed type
-            if any(
-                waste.waste_color == (self.knowledge.zone_type + 1)
-                for waste in self.knowledge.inventory
-            ):
+            if self.knowledge.inventory_colors & self._processed_bit:
                 self.logger.info("Decision: Drop waste (in correct transfer zone)")
                 return "drop_waste"
             else:
@@ -325,10 +333,7 @@ class Drone(Agent):
             self.logger.info("In drop zone with waste")
 
             # Check if waste is of the correct processed type
-            if any(
-                waste.waste_color == self.knowledge.zone_type
-                for waste in self.knowledge.inventory
-            ):
+            if self.knowledge.inventory_colors & self._zone_bit:
                 self.logger.info("Decision: Drop waste (in drop zone)")
                 return "drop_waste"
             else:
@@ -342,28 +347,25 @@ class Drone(Agent):
         # ============================================================================
 
         # Priority 2: Pick waste if at same position as compatible waste and has capacity
-        compatible_wastes = []
-        inventory_types = [w.waste_color for w in self.knowledge.inventory]
-        self.logger.info(f"Inventory types: {inventory_types}")
-        for waste_id, waste_pos in self.percepts.neighbor_wastes:
-            waste = self.model.get_agent_by_id(waste_id)
-
-            # Check if waste type is compatible with current inventory
-            if (
-                (not inventory_types or waste.waste_color in inventory_types)
-                and waste.waste_color == self.knowledge.zone_type
-                and waste_pos[0] != self.knowledge.grid_width - 1
-            ):
-                compatible_wastes.append(waste_id)
-
-        if compatible_wastes:
-            self.logger.info(f"Found {len(compatible_wastes)} compatible wastes nearby")
+        inventory_colors = self.knowledge.inventory_colors
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Inventory colors: %s", format(inventory_colors, "03b"))
+
+        # Nearby wastes only matter if one could be picked up right now
+        can_pickup_now = len(self.knowledge.inventory) < 2 and self.knowledge.can_pick
+        can_pickup_type = not inventory_colors or inventory_colors & self._zone_bit
+        compatible_waste_nearby = False
+        if can_pickup_now and can_pickup_type:
+            zone_type = self.knowledge.zone_type
+            drop_x = self._drop_x
+            # Stop at the first waste compatible with the drone's zone
+            compatible_waste_nearby = any(
+                waste_color == zone_type and waste_pos[0] != drop_x
+                for _, waste_pos, waste_color in self.percepts.neighbor_wastes
+            )
 
-        if (
-            compatible_wastes
-            and len(self.knowledge.inventory) < 2
-            and self.knowledge.can_pick
-        ):
+        if compatible_waste_nearby:
+            self.logger.info("Found compatible waste nearby")
             self.logger.info("Decision: Pick waste")
             return "pick_waste"
         elif not self.knowledge.can_pick:
@@ -392,7 +394,9 @@ class Drone(Agent):
         """
         self.logger.info("======== STEP BEGIN ========")
         self.logger.info(
-            f"Position: {self.pos} | Inventory: {len(self.knowledge.inventory)} items"
+            "Position: %s | Inventory: %s items",
+            self.pos,
+            len(self.knowledge.inventory),
         )
 
         # Update phase
@@ -404,11 +408,13 @@ class Drone(Agent):
         action = self.deliberate()
 
         # Action phase
-        self.logger.info(f"--- ACTION PHASE: {action.upper()} ---")
+        self.logger.info("--- ACTION PHASE: %s ---", action.upper())
         percept_dict = self.model.do(self, action)
-        self.percepts = DronePercepts(**percept_dict)
+        self.percepts.refresh(**percept_dict)
 
         self.logger.info(
-            f"Step complete | Position: {self.pos} | Inventory: {len(self.knowledge.inventory)} items"
+            "Step complete | Position: %s | Inventory: %s items",
+            self.pos,
+            len(self.knowledge.inventory),
         )
         self.logger.info("======== STEP END ========\n")
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
+from abc import ABCMeta, abstractmethod
+
 from mesa import Agent
 
 from communication.mailbox.mailbox import Mailbox
 from communication.message.message import Message
 from communication.message.message_service import MessageService
-from objects import Waste, Zone
 
 
-class CommunicatingAgent(Agent):
+class CommunicatingAgent(Agent, metaclass=ABCMeta):
     """CommunicatingAgent class.
     Class implementing communicating agent in a generalized manner.
 
@@ -27,9 +28,9 @@ class CommunicatingAgent(Agent):
         self.__mailbox = Mailbox()
         self.__messages_service = MessageService.get_instance()
 
+    @abstractmethod
     def step_agent(self):
         """The step methods of the agent called by the scheduler at each time tick."""
-        super().step()
 
     def get_name(self):
         """Return the name of the communicating agent."""
@@ -45,14 +46,21 @@ class CommunicatingAgent(Agent):
 
     def send_broadcast_message(self, performative, content):
         """Broadcast message through the MessageService object."""
-        for agent in self.model.agents:
-            # Skip the agent itself and the Waste and Zone agents
-            # as they are not supposed to receive messages.
-            if isinstance(agent, Waste) or isinstance(agent, Zone) or agent == self:
+        # Only communicating agents can receive messages, so the other agent
+        # types (Waste, Zone) are skipped as a whole rather than one by one.
+        for agent_type, agents in self.model.agents_by_type.items():
+            if not issubclass(agent_type, CommunicatingAgent):
                 continue
 
-            message = Message(self.unique_id, agent.unique_id, performative, content)
-            self.send_message(message)
+            for agent in agents:
+                # Skip the agent itself
+                if agent is self:
+                    continue
+
+                message = Message(
+                    self.unique_id, agent.unique_id, performative, content
+                )
+                self.send_message(message)
 
     def get_new_messages(self):
         """Return all the unread messages."""
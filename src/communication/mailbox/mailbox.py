@@ -23,13 +23,11 @@ class Mailbox:
     def get_new_messages(self):
         """Return all the messages from unread messages list."""
 
-        unread_messages = self.__unread_messages.copy()
-
-        if len(unread_messages) > 0:
-            for messages in unread_messages:
-                self.__read_messages.append(messages)
-
-        self.__unread_messages.clear()
+        # Hand over the unread list itself and start a new one, instead of
+        # copying it and moving its messages one by one
+        unread_messages = self.__unread_messages
+        self.__unread_messages = []
+        self.__read_messages.extend(unread_messages)
         return unread_messages
 
     def get_messages(self):
@@ -61,6 +61,11 @@ class MessageService:
     def find_agent_from_id(self, agent_id):
         """Return the agent according to the agent id given."""
 
+        # Use the model's ID index when it keeps one
+        get_agent_by_id = getattr(self.__model, "get_agent_by_id", None)
+        if get_agent_by_id is not None:
+            return get_agent_by_id(agent_id)
+
         for agent in self.__model.agents:
             if agent.unique_id == agent_id:
                 return agent
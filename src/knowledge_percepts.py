@@ -1,19 +1,40 @@
+from array import array
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from typing import FrozenSet, List, Optional, Set, Tuple
 
 from objects import Waste
 
 MAX_CARRY_TIMEOUT = 50  # Maximum carry timeout for waste
 
 
-@dataclass
+@dataclass(slots=True)
 class DronePercepts:
     """Represents the percepts of a drone agent."""
 
     neighbors_empty: List[Tuple[int, int]] = field(default_factory=list)
+    # Same cells as neighbors_empty, for membership tests
+    neighbors_empty_set: FrozenSet[Tuple[int, int]] = frozenset()
     neighbor_zones: List[Tuple[int, Tuple[int, int]]] = field(default_factory=list)
     neighbor_drones: List[Tuple[int, Tuple[int, int]]] = field(default_factory=list)
-    neighbor_wastes: List[Tuple[int, Tuple[int, int]]] = field(default_factory=list)
+    # (id, position, color) of each neighboring waste
+    neighbor_wastes: List[Tuple[int, Tuple[int, int], int]] = field(
+        default_factory=list
+    )
+
+    def refresh(
+        self,
+        neighbors_empty,
+        neighbors_empty_set,
+        neighbor_zones,
+        neighbor_drones,
+        neighbor_wastes,
+    ):
+        """Overwrite the percepts in place with the latest observations."""
+        self.neighbors_empty = neighbors_empty
+        self.neighbors_empty_set = neighbors_empty_set
+        self.neighbor_zones = neighbor_zones
+        self.neighbor_drones = neighbor_drones
+        self.neighbor_wastes = neighbor_wastes
 
     def __str__(self):
         return (
@@ -30,15 +51,15 @@ class DronePercepts:
         return self.__str__()
 
 
-@dataclass
+@dataclass(slots=True)
 class DroneKnowledge:
     """Represents the knowledge base of a drone agent."""
 
     inventory: List[Waste] = field(default_factory=list)
+    inventory_colors: int = 0  # Bitmask of carried waste colors, bit i for color i
     can_pick: bool = True
     should_move_east: bool = False
-    actions: List[str] = field(default_factory=list)
-    percepts: List[DronePercepts] = field(default_factory=list)
+    last_action: Optional[str] = None
     grid_width: int = 0
     grid_height: int = 0
     zone_type: int = 0
@@ -48,12 +69,49 @@ class DroneKnowledge:
         default_factory=set
     )
     target_pos: Optional[Tuple[int, int]] = None
-    visited_positions: Dict[Tuple[int, int], int] = field(default_factory=dict)
+    # Unsigned visit count per grid cell, flattened row by row (index y * width + x)
+    visited_positions: array = field(default_factory=lambda: array("I"))
+    visited_cell_count: int = 0  # Number of cells visited at least once
 
     carry_timeout: int = MAX_CARRY_TIMEOUT
     deadlock_status: str = "idle"  # Status of the drone
     ignored_waste_positions: Set[Tuple[int, int]] = field(default_factory=set)
 
+    def __post_init__(self):
+        if not self.visited_positions:
+            self.visited_positions = array("I", [0]) * (
+                self.grid_width * self.grid_height
+            )
+
+    def visit_count(self, pos: Tuple[int, int]) -> int:
+        """Return how many times the cell at pos has been visited."""
+        return self.visited_positions[pos[1] * self.grid_width + pos[0]]
+
+    def record_visit(self, pos: Tuple[int, int]) -> int:
+        """Count one more visit of the cell at pos and return its new count."""
+        index = pos[1] * self.grid_width + pos[0]
+        visits = self.visited_positions[index] + 1
+        self.visited_positions[index] = visits
+        if visits == 1:
+            self.visited_cell_count += 1
+        return visits
+
+    def accepts_waste(self, waste_color: int) -> bool:
+        """Check if a waste can be added to the inventory: it must be of the
+        drone's zone color, and the inventory empty or holding that color."""
+        if waste_color != self.zone_type:
+            return False
+        return not self.inventory_colors or bool(
+            self.inventory_colors & (1 << waste_color)
+        )
+
+    def update_inventory_colors(self):
+        """Recompute the inventory colors bitmask from the inventory."""
+        colors = 0
+        for waste in self.inventory:
+            colors |= 1 << waste.waste_color
+        self.inventory_colors = colors
+
     def __str__(self):
         inventory_str = [
             f"Waste(id={w.unique_id}, color={w.waste_color})" for w in self.inventory
@@ -72,8 +130,8 @@ class DroneKnowledge:
             f"\tMoveEast: {self.should_move_east},\n"
             f"\tInTransferZone: {self.in_transfer_zone},\n"
             f"\tInDropZone: {self.in_drop_zone},\n"
-            f"\tActions: {self.actions},\n"
-            f"\tVisitedCount: {len(self.visited_positions)}\n"  # Add visited count for brevity
+            f"\tLastAction: {self.last_action},\n"
+            f"\tVisitedCount: {self.visited_cell_count}\n"  # Add visited count for brevity
             f"\tCarryTimeout: {self.carry_timeout},\n"
             f"\tStatus: {self.deadlock_status}\n"
             f"\tIgnoredWastePositions: {self.ignored_waste_positions}\n"
@@ -1,14 +1,47 @@
 import logging
 import os
+from typing import TYPE_CHECKING
 
 from mesa import Model
 from mesa.datacollection import DataCollector
 from mesa.space import MultiGrid
 
-from agents_random import Drone
 from communication.message.message_service import MessageService
 from objects import Waste, Zone
 
+if TYPE_CHECKING:
+    from agents import Drone
+
+# Model level metrics collected at every step
+METRICS = (
+    "green_wastes",
+    "yellow_wastes",
+    "red_wastes",
+    "wastes_in_drop_zone",
+    "wastes_not_in_drop_zone",
+    "wastes_in_inventories",
+)
+
+
+def _load_communicating_drone():
+    from agents import Drone
+
+    return Drone
+
+
+def _load_random_drone():
+    from agents_random import Drone
+
+    return Drone
+
+
+# Drone class loader for each agent implementation, so that only the selected
+# implementation gets imported
+DRONE_LOADERS = {
+    "agents": _load_communicating_drone,
+    "agents_random": _load_random_drone,
+}
+
 
 class Environment(Model):
     def __init__(
@@ -26,13 +59,14 @@ class Environment(Model):
     ):
         super().__init__(seed=seed)
 
-        # Dynamically import the selected agent implementation
-        if agent_implementation == "agents_random":
-            from agents_random import Drone
-        else:
-            from agents import Drone
+        # Registered agents by unique ID, kept in sync by register_agent and
+        # deregister_agent
+        self._agents_by_id = {}
 
-        self.Drone = Drone
+        # Dynamically import the selected agent implementation, defaulting to
+        # the communicating drones
+        load_drone = DRONE_LOADERS.get(agent_implementation, _load_communicating_drone)
+        self.Drone = load_drone()
 
         if MessageService.get_instance() is None:
             self.message_service = MessageService(self)
@@ -48,56 +82,7 @@ class Environment(Model):
         self._setup_logging()
 
         # Set up data collector
-        self.datacollector = DataCollector(
-            model_reporters={
-                "green_wastes": lambda m: len(
-                    [
-                        a
-                        for a in m.grid.agents
-                        if a.__class__.__name__ == "Waste" and a.waste_color == 0
-                    ]
-                ),
-                "yellow_wastes": lambda m: len(
-                    [
-                        a
-                        for a in m.grid.agents
-                        if a.__class__.__name__ == "Waste" and a.waste_color == 1
-                    ]
-                ),
-                "red_wastes": lambda m: len(
-                    [
-                        a
-                        for a in m.grid.agents
-                        if a.__class__.__name__ == "Waste" and a.waste_color == 2
-                    ]
-                ),
-                "wastes_in_drop_zone": lambda m: len(
-                    [
-                        a
-                        for a in m.grid.agents
-                        if a.__class__.__name__ == "Waste"
-                        and a.waste_color == 2
-                        and m._get_zone(a.pos).is_drop_zone
-                    ]
-                ),
-                "wastes_not_in_drop_zone": lambda m: len(
-                    [
-                        a
-                        for a in m.grid.agents
-                        if a.__class__.__name__ == "Waste"
-                        and a.pos[0] != m.grid.width - 1
-                    ]
-                ),
-                "wastes_in_inventories": lambda m: sum(
-                    [
-                        len(a.knowledge.inventory)
-                        for a in m.grid.agents
-                        if a.__class__.__name__ == "Drone" and a.knowledge.inventory
-                    ]
-                ),
-            },
-            agent_reporters={},
-        )
+        self._setup_datacollector()
 
         # Store number of agents and wastes per zone type
         self.green_agents = green_agents
@@ -115,7 +100,20 @@ class Environment(Model):
 
         # No torus, agents cannot move off the grid
         self.grid = MultiGrid(width, height, torus=False)
-        self.zone_mapping = {"G": 0, "Y": 1, "R": 2}
+
+        # Columns highlighted as zone borders (baseline portrayal rule)
+        w3 = width // 3
+        self._zone_border_xs = frozenset({w3 - 1, 2 * w3 - 1})
+
+        # Columns of each zone type, with the same bounds the zones are built on
+        zone_bounds = (0, width // 3, 2 * width // 3, width)
+        self._zone_columns = tuple(
+            range(zone_bounds[z], zone_bounds[z + 1]) for z in range(3)
+        )
+        # Zone type of each column
+        self._zone_of_x = tuple(
+            z for z, columns in enumerate(self._zone_columns) for _ in columns
+        )
 
         self.logger.info(
             "Initializing environment with %d agents (%d green, %d yellow, %d red), "
@@ -140,19 +138,83 @@ class Environment(Model):
                 a = Zone(self, zone_color, is_drop_zone)
                 self.grid.place_agent(a, (x, y))
                 self.logger.info(
-                    f"Placed zone {a.unique_id} at position {(x, y)} with color {zone_color} | "
-                    f"Zone type: {zone_color}, Drop zone: {is_drop_zone}"
+                    "Placed zone %s at position %s with color %s | "
+                    "Zone type: %s, Drop zone: %s",
+                    a.unique_id,
+                    (x, y),
+                    zone_color,
+                    zone_color,
+                    is_drop_zone,
                 )
 
+        self._place_wastes_and_drones()
+
+    def reset(self, seed=None):
+        """
+        Reset the simulation in place for a new run with the given seed.
+        The grid and its zones are kept, wastes and drones are placed again
+        and the collected data is cleared, so that the run matches one from
+        a freshly built environment with the same seed.
+        """
+        self.reset_randomizer(seed)
+        self.reset_rng(seed)
+        self.steps = 0
+        self.running = True
+
+        # The message service is shared, make sure it delivers to this model
+        self.message_service.set_model(self)
+
+        # Clear old log files and set up logging again, as on construction
+        self._clear_logs()
+        self._setup_logging()
+
+        # Remove wastes (on the grid, carried or transformed) and drones
+        for agent in list(self.agents):
+            if type(agent) is Zone:
+                continue
+            if agent.pos is not None:
+                self.grid.remove_agent(agent)
+            agent.remove()
+
+        self.num_agents = self.green_agents + self.yellow_agents + self.red_agents
+        self.waste_state_changes = {}
+        self._setup_datacollector()
+
+        self.logger.info("Resetting environment with seed %s", seed)
+        self._place_wastes_and_drones()
+
+    def _setup_datacollector(self):
+        """Set up an empty data collector for the model metrics"""
+        # Metrics are computed once per step by _update_metrics and the
+        # reporters only read them back
+        self.metrics = dict.fromkeys(METRICS, 0)
+
+        # Last collected row at which any metric changed, and the metrics at
+        # that row, tracked as rows are collected
+        self.collected_rows = 0
+        self.last_active_step = 0
+        self.last_active_metrics = dict(self.metrics)
+
+        self.datacollector = DataCollector(
+            model_reporters={
+                name: (lambda m, name=name: m.metrics[name]) for name in METRICS
+            },
+            agent_reporters={},
+        )
+
+    def _place_wastes_and_drones(self):
+        """Place the configured wastes and drones in their zones"""
+        width, height = self.grid.width, self.grid.height
+
         # Initialize wastes in each zone type
-        self._initialize_wastes_by_zone(0, green_wastes, width, height)  # Green zone
-        self._initialize_wastes_by_zone(1, yellow_wastes, width, height)  # Yellow zone
-        self._initialize_wastes_by_zone(2, red_wastes, width, height)  # Red zone
+        self._initialize_wastes_by_zone(0, self.green_wastes, width, height)
+        self._initialize_wastes_by_zone(1, self.yellow_wastes, width, height)
+        self._initialize_wastes_by_zone(2, self.red_wastes, width, height)
 
         # Initialize agents in each zone type
-        self._initialize_drones_by_zone(0, green_agents, width, height)  # Green zone
-        self._initialize_drones_by_zone(1, yellow_agents, width, height)  # Yellow zone
-        self._initialize_drones_by_zone(2, red_agents, width, height)  # Red zone
+        self._initialize_drones_by_zone(0, self.green_agents, width, height)
+        self._initialize_drones_by_zone(1, self.yellow_agents, width, height)
+        self._initialize_drones_by_zone(2, self.red_agents, width, height)
 
     def _clear_logs(self):
         """Clear all existing log files before starting a new simulation"""
@@ -192,19 +254,17 @@ class Environment(Model):
 
     def _initialize_wastes_by_zone(self, zone_type, num_wastes, width, height):
         """Initialize the specified number of wastes in a specific zone type"""
-        zone_positions = []
-
         # Exclude the drop zone for red wastes
         if zone_type == 2:
             width = width - 1
 
-        # Find all positions of the specified zone type
-        for x in range(width):
-            for y in range(height):
-                pos = (x, y)
-                zone = self._get_zone(pos)
-                if zone and zone.zone_type == zone_type:
-                    zone_positions.append(pos)
+        # All positions of the specified zone type, from its columns
+        columns = self._zone_columns[zone_type]
+        zone_positions = [
+            (x, y)
+            for x in range(columns.start, min(columns.stop, width))
+            for y in range(height)
+        ]
 
         # Create wastes in the zone
         for _ in range(num_wastes):
@@ -213,20 +273,21 @@ class Environment(Model):
                 a = Waste(self, zone_type)
                 self.grid.place_agent(a, pos)
                 self.logger.info(
-                    f"Placed waste {a.unique_id} at position {pos} with color {zone_type}"
+                    "Placed waste %s at position %s with color %s",
+                    a.unique_id,
+                    pos,
+                    zone_type,
                 )
 
     def _initialize_drones_by_zone(self, zone_type, num_drones, width, height):
         """Initialize the specified number of drones in a specific zone type"""
-        zone_positions = []
-
-        # Find all positions of the specified zone type
-        for x in range(width):
-            for y in range(height):
-                pos = (x, y)
-                zone = self._get_zone(pos)
-                if zone and zone.zone_type == zone_type:
-                    zone_positions.append(pos)
+        # All positions of the specified zone type, from its columns
+        columns = self._zone_columns[zone_type]
+        zone_positions = [
+            (x, y)
+            for x in range(columns.start, min(columns.stop, width))
+            for y in range(height)
+        ]
 
         # Create drones in the zone
         for _ in range(num_drones):
@@ -235,7 +296,10 @@ class Environment(Model):
                 a = self.Drone(self, zone_type)
                 self.grid.place_agent(a, pos)
                 self.logger.info(
-                    f"Placed drone {a.unique_id} at position {pos} in zone type {zone_type}"
+                    "Placed drone %s at position %s in zone type %s",
+                    a.unique_id,
+                    pos,
+                    zone_type,
                 )
 
     def _setup_logging(self):
@@ -271,84 +335,128 @@ class Environment(Model):
         self.logger.addHandler(file_handler)
 
     def step(self):
+        self._update_metrics()
         self.datacollector.collect(self)
+        self._track_activity()
 
-        # Shuffle agents and execute their steps
-        self.agents.shuffle_do("step_agent")
+        # Shuffle drones and execute their steps, wastes and zones are static
+        drones = self.agents_by_type.get(self.Drone)
+        if drones:
+            drones.shuffle_do("step_agent")
 
         # Check grid clean and all wastes treated when stationary
         self._check_grid_clean_and_wastes_treated()
 
+    def _update_metrics(self):
+        """Compute all model metrics in a single pass over wastes and drones."""
+        wastes_by_color = [0, 0, 0]
+        wastes_in_drop_zone = 0
+        wastes_not_in_drop_zone = 0
+        drop_x = self.grid.width - 1
+
+        for waste in self.agents_by_type.get(Waste, ()):
+            # Wastes carried by drones or already transformed are off the grid
+            if waste.pos is None:
+                continue
+            wastes_by_color[waste.waste_color] += 1
+            if waste.pos[0] == drop_x:
+                wastes_in_drop_zone += waste.waste_color == 2
+            else:
+                wastes_not_in_drop_zone += 1
+
+        metrics = self.metrics
+        metrics["green_wastes"] = wastes_by_color[0]
+        metrics["yellow_wastes"] = wastes_by_color[1]
+        metrics["red_wastes"] = wastes_by_color[2]
+        metrics["wastes_in_drop_zone"] = wastes_in_drop_zone
+        metrics["wastes_not_in_drop_zone"] = wastes_not_in_drop_zone
+        metrics["wastes_in_inventories"] = sum(
+            len(drone.knowledge.inventory)
+            for drone in self.agents_by_type.get(self.Drone, ())
+        )
+
+    def _track_activity(self):
+        """Record the collected row if any metric changed since the last one."""
+        if self.collected_rows == 0 or self.metrics != self.last_active_metrics:
+            self.last_active_step = self.collected_rows
+            self.last_active_metrics = dict(self.metrics)
+        self.collected_rows += 1
+
     def _check_grid_clean_and_wastes_treated(self):
         """Check if the grid is clean and all wastes are treated."""
-        model_vars = self.datacollector.get_model_vars_dataframe()
-        if not model_vars.empty:
-            wastes_not_in_drop_zone = model_vars["wastes_not_in_drop_zone"].iloc[-1]
-            wastes_in_inventories = model_vars["wastes_in_inventories"].iloc[-1]
-            if wastes_not_in_drop_zone == 0:
-                self.logger.info("Grid is clean: all wastes are in the drop zone.")
-            if wastes_in_inventories == 0:
-                self.logger.info(
-                    "All wastes have been treated: no wastes in inventories."
-                )
+        if self.metrics["wastes_not_in_drop_zone"] == 0:
+            self.logger.info("Grid is clean: all wastes are in the drop zone.")
+        if self.metrics["wastes_in_inventories"] == 0:
+            self.logger.info("All wastes have been treated: no wastes in inventories.")
 
     def _get_zone(self, pos):
         cellmates = self.grid.get_cell_list_contents(pos)
         for agent in cellmates:
-            if agent.__class__.__name__ == "Zone":
+            if type(agent) is Zone:
                 return agent
         return None
 
     def remove_agent(self, agent):
         self.grid.remove_agent(agent)
         self.num_agents -= 1
-        self.logger.info(f"Removed agent {agent.unique_id} from the environment")
+        self.logger.info("Removed agent %s from the environment", agent.unique_id)
 
     def add_agent(self, agent, pos):
         self.grid.place_agent(agent, pos)
         self.num_agents += 1
-        self.logger.info(f"Added agent {agent.unique_id} at position {pos}")
+        self.logger.info("Added agent %s at position %s", agent.unique_id, pos)
+
+    def register_agent(self, agent):
+        super().register_agent(agent)
+        self._agents_by_id[agent.unique_id] = agent
+
+    def deregister_agent(self, agent):
+        super().deregister_agent(agent)
+        del self._agents_by_id[agent.unique_id]
 
     def get_agent_by_id(self, agent_id):
         """Retrieve an agent by its unique ID"""
-        return self.agents.select(lambda a: a.unique_id == agent_id)[0]
+        return self._agents_by_id[agent_id]
 
     @staticmethod
-    def do(drone: Drone, action: str) -> dict:
+    def do(drone: "Drone", action: str) -> dict:
         # Removed call to track_agent_movement (not needed)
         getattr(drone, action)()
-        drone.logger.info(f"Executing action: {action}")
+        drone.logger.info("Executing action: %s", action)
         neighbors = drone.model.grid.get_neighborhood(
             drone.pos, moore=False, include_center=True
         )
-        neighbor_zones = [
-            a
-            for a in drone.model.grid.get_cell_list_contents(neighbors)
-            if a.__class__.__name__ == "Zone"
-        ]
-        neighbor_drones = [
-            a
-            for a in drone.model.grid.get_cell_list_contents(neighbors)
-            if a.__class__.__name__ == "Drone"
-        ]
-        neighbor_wastes = [
-            a
-            for a in drone.model.grid.get_cell_list_contents(neighbors)
-            if a.__class__.__name__ == "Waste"
-        ]
+
+        # Read the neighboring cells once and sort their contents by type
+        neighbor_zones = []
+        neighbor_drones = []
+        neighbor_wastes = []
+        drone_class = drone.model.Drone
+        for a in drone.model.grid.get_cell_list_contents(neighbors):
+            agent_type = type(a)
+            if agent_type is Zone:
+                neighbor_zones.append(a)
+            elif agent_type is drone_class:
+                neighbor_drones.append(a)
+            elif agent_type is Waste:
+                neighbor_wastes.append(a)
+
+        # Zones are vertical stripes, so a cell's zone type follows from its column
         drone_zone_type = drone.knowledge.zone_type
-        valid_neighbors_cells = []
-        for pos in neighbors:
-            zone_agent = neighbor_zones[neighbors.index(pos)]
-            if zone_agent and zone_agent.zone_type <= drone_zone_type:
-                valid_neighbors_cells.append(pos)
+        zone_of_x = drone.model._zone_of_x
+        valid_neighbors_cells = [
+            pos for pos in neighbors if zone_of_x[pos[0]] <= drone_zone_type
+        ]
         neighbors_cells_empty = set(valid_neighbors_cells) - set(
             [a.pos for a in neighbor_drones]
         )
         percepts = {
             "neighbors_empty": list(neighbors_cells_empty),
+            "neighbors_empty_set": frozenset(neighbors_cells_empty),
             "neighbor_zones": [(a.zone_type, a.pos) for a in neighbor_zones],
             "neighbor_drones": [(a.unique_id, a.pos) for a in neighbor_drones],
-            "neighbor_wastes": [(a.unique_id, a.pos) for a in neighbor_wastes],
+            "neighbor_wastes": [
+                (a.unique_id, a.pos, a.waste_color) for a in neighbor_wastes
+            ],
         }
         return percepts
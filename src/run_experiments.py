@@ -1,3 +1,5 @@
+import argparse
+import csv
 import os
 from typing import List, Tuple
 
@@ -11,14 +13,68 @@ from model import Environment
 
 sns.set_theme(style="whitegrid")
 
+# Figures use constrained layout and a fixed resolution, so saving them
+# does not need a tight bounding box pass
+SAVEFIG_DPI = 100
+
+# Parameters reported for each run in the stationary steps CSV
+REPORTED_PARAMS = [
+    "green_agents",
+    "yellow_agents",
+    "red_agents",
+    "green_wastes",
+    "yellow_wastes",
+    "red_wastes",
+    "width",
+    "height",
+]
+
+# Variables extracted at the stationary step of each run
+STATIONARY_VARS = [
+    "green_wastes",
+    "yellow_wastes",
+    "red_wastes",
+    "wastes_in_drop_zone",
+    "wastes_not_in_drop_zone",
+    "wastes_in_inventories",
+]
+
+# Columns of the stationary steps CSV, stationary values override the
+# parameters of the same name
+RUN_INFO_FIELDS = list(
+    dict.fromkeys(
+        [
+            "experiment",
+            "variation",
+            "agent_implementation",
+            "run",
+            *REPORTED_PARAMS,
+            "stationary_step",
+            *STATIONARY_VARS,
+        ]
+    )
+)
+
 
-def run_experiment(params, steps=500):
+def _last_active_steps(values):
     """
-    Run a single experiment with given parameters
+    Return the last step at which any variable changed.
+    `values` has shape (steps, vars) for a single run or (steps, vars, runs)
+    for stacked runs, in which case one step is returned per run.
+    Runs that never change are stationary from step 0.
     """
+    diffs = np.diff(values, axis=0, prepend=values[:1])
+    activity = (np.abs(diffs).sum(axis=1) > 0)[::-1]
+    return np.where(
+        activity.any(axis=0), len(activity) - 1 - activity.argmax(axis=0), 0
+    )
+
 
-    # Create model with tracker
-    model = Environment(
+def _build_model(params):
+    """
+    Create an environment for the given parameters
+    """
+    return Environment(
         green_agents=params["green_agents"],
         yellow_agents=params["yellow_agents"],
         red_agents=params["red_agents"],
@@ -33,172 +89,114 @@ def run_experiment(params, steps=500):
         ],  # Pass agent implementation
     )
 
+
+def run_experiment(params, steps=500, model=None, collect_df=True):
+    """
+    Run a single experiment with given parameters.
+    If `model` is given, it must have been built with the same parameters,
+    it is reset with the run seed instead of building a new environment.
+    If `collect_df` is False, the collected data is not turned into a
+    DataFrame and None is returned in its place.
+    """
+
+    if model is None:
+        model = _build_model(params)
+    else:
+        model.reset(params["seed"])
+
+    return _run_model(model, steps, collect_df)
+
+
+def _run_model(model, steps=500, collect_df=True):
+    """
+    Run a built or freshly reset environment for `steps` steps and return
+    its results, as described in `run_experiment`.
+    """
     # Run simulation
     for _ in range(steps):
         model.step()
 
-    df = model.datacollector.get_model_vars_dataframe()
-    # Compute stationary step
-    diffs = df.diff().fillna(0)
-    activity = diffs.abs().sum(axis=1) > 0
-    if activity.any():
-        last_active_step = np.where(activity)[0][-1]
-    else:
-        last_active_step = 0
-
-    # Extract variable values at stationary step
-    stationary_vars = {}
-    for var in [
-        "green_wastes",
-        "yellow_wastes",
-        "red_wastes",
-        "wastes_in_drop_zone",
-        "wastes_not_in_drop_zone",
-        "wastes_in_inventories",
-    ]:
-        if var in df.columns:
-            stationary_vars[var] = df.iloc[last_active_step][var]
-        else:
-            stationary_vars[var] = None
+    df = model.datacollector.get_model_vars_dataframe() if collect_df else None
+
+    # Stationary step and variable values at that step, as tracked by the
+    # model while running, missing variables are None
+    last_active_step = model.last_active_step
+    stationary_vars = {
+        var: model.last_active_metrics.get(var) for var in STATIONARY_VARS
+    }
 
     return df, last_active_step, stationary_vars
 
 
 def run_multiple_experiments(
-    num_runs, base_params, parameter_variations, agent_implementations
+    num_runs,
+    base_params,
+    parameter_variations,
+    agent_implementations,
+    csv_path="results/experiment_stationary_steps.csv",
+    collect_df=True,
 ):
     """
     Run multiple experiments with different parameters for each agent implementation.
-    Returns results and a list of dicts, one per run x benchmark, for reporting.
+    One row per run x benchmark, plus one average row per benchmark, is written
+    to `csv_path` as soon as it is produced.
+    Returns results and the list of average rows, for reporting. Results are
+    only kept when `collect_df` is True.
     """
-    # base_params are now passed as an argument
-    # parameter_variations are now passed as an argument
-
     results = []
-    run_infos = []
-
-    for agent_impl in agent_implementations:
-        print(f"\n--- Running experiments for Agent Implementation: {agent_impl} ---")
-        # Run with base parameters if no variations
-        if not parameter_variations:
-            exp_name = f"baseline_{agent_impl}"  # Include agent impl in name
-            params = base_params.copy()
-            params["agent_implementation"] = agent_impl  # Add agent impl to params
-            stationary_steps = []
-            run_stationary_vars_list = []  # Store stationary vars for each run
-            for i in range(num_runs):
-                run_params = params.copy()
-                run_params["seed"] = i
-                df, last_active_step, stationary_vars = run_experiment(run_params)
-                results.append((exp_name, df))  # Store exp_name with df
-                stationary_steps.append(last_active_step)
-                run_stationary_vars_list.append(stationary_vars)  # Append run's vars
-                run_infos.append(
-                    {
-                        "experiment": exp_name,
-                        "agent_implementation": agent_impl,  # Add agent impl info
-                        "run": i + 1,
-                        **{
-                            k: params[k]
-                            for k in [
-                                "green_agents",
-                                "yellow_agents",
-                                "red_agents",
-                                "green_wastes",
-                                "yellow_wastes",
-                                "red_wastes",
-                                "width",
-                                "height",
-                            ]
-                        },
-                        "stationary_step": last_active_step,
-                        **stationary_vars,
-                    }
-                )
-                print(f"Completed experiment {i + 1}/{num_runs} for {exp_name}")
-            # Add average row
-            if run_stationary_vars_list:  # Check if list is not empty
-                avg_vars = {
-                    k: np.mean(
-                        [
-                            vars_[k]
-                            for vars_ in run_stationary_vars_list
-                            if vars_ is not None and k in vars_
-                        ]
-                    )
-                    for k in run_stationary_vars_list[0]
-                    if run_stationary_vars_list[0] is not None
-                }
-            else:
-                avg_vars = {}
+    avg_infos = []
 
-            run_infos.append(
-                {
-                    "experiment": exp_name,
-                    "agent_implementation": agent_impl,  # Add agent impl info
-                    "run": "avg",
-                    **{
-                        k: params[k]
-                        for k in [
-                            "green_agents",
-                            "yellow_agents",
-                            "red_agents",
-                            "green_wastes",
-                            "yellow_wastes",
-                            "red_wastes",
-                            "width",
-                            "height",
-                        ]
-                    },
-                    "stationary_step": np.mean(stationary_steps)
-                    if stationary_steps
-                    else 0,
-                    **avg_vars,
-                }
+    # Run with base parameters only if there are no variations
+    variations = parameter_variations or {"baseline": {}}
+
+    with open(csv_path, "w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=RUN_INFO_FIELDS)
+        writer.writeheader()
+
+        for agent_impl in agent_implementations:
+            print(
+                f"\n--- Running experiments for Agent Implementation: {agent_impl} ---"
             )
-        else:
-            # Run with parameter variations
-            for variation_name, param_changes in parameter_variations.items():
+            for variation_name, param_changes in variations.items():
                 exp_name = (
                     f"{variation_name}_{agent_impl}"  # Include agent impl in name
                 )
                 params = base_params.copy()
                 params.update(param_changes)
                 params["agent_implementation"] = agent_impl  # Add agent impl to params
+                reported_params = {k: params[k] for k in REPORTED_PARAMS}
                 stationary_steps = []
                 run_stationary_vars_list = []  # Store stationary vars for each run
+                # The first run builds the environment, the next ones reset it
+                # with their seed
+                model = None
                 for i in range(num_runs):
                     exp_params = params.copy()
                     exp_params["seed"] = i
-                    df, last_active_step, stationary_vars = run_experiment(exp_params)
-                    results.append((exp_name, df))  # Store exp_name with df
+                    if model is None:
+                        model = _build_model(exp_params)
+                    else:
+                        model.reset(i)
+                    df, last_active_step, stationary_vars = _run_model(
+                        model, collect_df=collect_df
+                    )
+                    if collect_df:
+                        results.append((exp_name, df))  # Store exp_name with df
                     stationary_steps.append(last_active_step)
-                    run_stationary_vars_list.append(
-                        stationary_vars
-                    )  # Append run's vars
-                    run_infos.append(
+                    run_stationary_vars_list.append(stationary_vars)
+                    writer.writerow(
                         {
                             "experiment": exp_name,
-                            "agent_implementation": agent_impl,  # Add agent impl info
+                            "variation": variation_name,
+                            "agent_implementation": agent_impl,
                             "run": i + 1,
-                            **{
-                                k: params[k]
-                                for k in [
-                                    "green_agents",
-                                    "yellow_agents",
-                                    "red_agents",
-                                    "green_wastes",
-                                    "yellow_wastes",
-                                    "red_wastes",
-                                    "width",
-                                    "height",
-                                ]
-                            },
+                            **reported_params,
                             "stationary_step": last_active_step,
                             **stationary_vars,
                         }
                     )
                     print(f"Completed experiment {i + 1}/{num_runs} for {exp_name}")
+
                 # Add average row
                 if run_stationary_vars_list:  # Check if list is not empty
                     avg_vars = {
@@ -215,32 +213,21 @@ def run_multiple_experiments(
                 else:
                     avg_vars = {}
 
-                run_infos.append(
-                    {
-                        "experiment": exp_name,
-                        "agent_implementation": agent_impl,  # Add agent impl info
-                        "run": "avg",
-                        **{
-                            k: params[k]
-                            for k in [
-                                "green_agents",
-                                "yellow_agents",
-                                "red_agents",
-                                "green_wastes",
-                                "yellow_wastes",
-                                "red_wastes",
-                                "width",
-                                "height",
-                            ]
-                        },
-                        "stationary_step": np.mean(stationary_steps)
-                        if stationary_steps
-                        else 0,
-                        **avg_vars,
-                    }
-                )
+                avg_info = {
+                    "experiment": exp_name,
+                    "variation": variation_name,
+                    "agent_implementation": agent_impl,
+                    "run": "avg",
+                    **reported_params,
+                    "stationary_step": np.mean(stationary_steps)
+                    if stationary_steps
+                    else 0,
+                    **avg_vars,
+                }
+                writer.writerow(avg_info)
+                avg_infos.append(avg_info)
 
-    return results, run_infos
+    return results, avg_infos
 
 
 def analyze_results(results: List[Tuple[str, pd.DataFrame]]):
@@ -270,42 +257,50 @@ def analyze_results(results: List[Tuple[str, pd.DataFrame]]):
     for exp_name, df in results:  # Directly unpack tuple
         exp_dict.setdefault(exp_name, []).append(df)
 
+    if not exp_dict:
+        return
+
+    # Create a single figure sized for the largest variable count, and reuse
+    # it for every experiment
+    max_vars = max(len(runs[0].columns) for runs in exp_dict.values())
+    ncols = NUMBER_PLOT_COLS
+    nrows = (max_vars + ncols - 1) // ncols
+    fig, axes = plt.subplots(
+        nrows,
+        ncols,
+        figsize=(4 * ncols, 4 * nrows),
+        squeeze=False,
+        layout="constrained",
+    )
+    axes = axes.flatten()
+
     for exp_name, runs in exp_dict.items():
         print(f"\nExperiment: {exp_name}")
         num_runs = len(runs)
         variables = runs[0].columns
         num_vars = len(variables)
-        ncols = NUMBER_PLOT_COLS
-        nrows = (num_vars + ncols - 1) // ncols
-
-        # Compute stationary steps for all runs
-        stationary_steps = []
-        for df in runs:
-            diffs = df.diff().fillna(0)
-            activity = diffs.abs().sum(axis=1) > 0
-            if activity.any():
-                last_active_step = np.where(activity)[0][-1]
-            else:
-                last_active_step = 0
-            stationary_steps.append(last_active_step)
-
-        fig, axes = plt.subplots(
-            nrows, ncols, figsize=(4 * ncols, 4 * nrows), squeeze=False
-        )
-        axes = axes.flatten()
+
+        # Stack all runs into a single (steps, vars, runs) array
+        x = runs[0].index.to_numpy()
+        stack = np.stack([df.to_numpy() for df in runs], axis=-1)
+
+        # Compute stationary steps for all runs at once
+        stationary_steps = _last_active_steps(stack)
+
+        # Clear the previous experiment, hiding subplots without a variable
+        for k, ax in enumerate(axes):
+            ax.clear()
+            ax.set_visible(k < num_vars)
 
         for j, var in enumerate(variables):
             ax = axes[j]
             base_color = base_colors.get(var, "gray")
-            for i, df in enumerate(runs):
+            # Draw all runs of this variable in a single call
+            lines = ax.plot(x, stack[:, j, :], color=base_color)
+            for i, line in enumerate(lines):
                 alpha = 0.4 + 0.6 * (i / max(1, num_runs - 1))
-                ax.plot(
-                    df.index,
-                    df[var],
-                    label=f"Run {i + 1}",
-                    color=base_color,
-                    alpha=alpha,
-                )
+                line.set_alpha(alpha)
+                line.set_label(f"Run {i + 1}")
                 # Draw stationary line for this run
                 ax.axvline(
                     stationary_steps[i],
@@ -318,19 +313,25 @@ def analyze_results(results: List[Tuple[str, pd.DataFrame]]):
             ax.set_ylabel(prettify(var))
             ax.set_xlim(0, 600)
             ax.legend()
-        # Hide unused subplots
-        for k in range(num_vars, len(axes)):
-            fig.delaxes(axes[k])
-        plt.tight_layout()
-        plt.suptitle(f"Experiment: {prettify(exp_name)}", y=1.02)
+        fig.suptitle(f"Experiment: {prettify(exp_name)}")
         # Save plot with the full experiment name (including agent impl)
-        plt.savefig(f"results/{exp_name}_plots.png", bbox_inches="tight")
-        plt.close(fig)  # Close the figure to free memory
+        fig.savefig(f"results/{exp_name}_plots.png", dpi=SAVEFIG_DPI)
+
+    plt.close(fig)  # Close the figure to free memory
 
 
 if __name__ == "__main__":
     import os
 
+    parser = argparse.ArgumentParser(description="Run the waste collection experiments")
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Skip the per-experiment variable plots and the run data they need",
+    )
+    args = parser.parse_args()
+    PLOT_RESULTS = not args.no_plot
+
     # Create results directory if it doesn't exist
     if not os.path.exists("results"):
         os.makedirs("results")
@@ -349,31 +350,26 @@ if __name__ == "__main__":
     # Define agent implementations to test
     agent_implementations_to_run = ["agents_with_comm", "agents_random_walk"]
 
-    # Run experiments with parameter variations for both implementations
-    results, run_infos = run_multiple_experiments(
+    # Run experiments with parameter variations for both implementations,
+    # one line per run x benchmark is streamed to the stationary steps CSV
+    results, avg_infos = run_multiple_experiments(
         num_runs=3,
         base_params=base_params,  # Pass loaded base_params
         parameter_variations=parameter_variations,  # Pass loaded variations
         agent_implementations=agent_implementations_to_run,  # Pass implementations
+        csv_path="results/experiment_stationary_steps.csv",
+        collect_df=PLOT_RESULTS,
     )
 
-    # Save run_infos as CSV: one line per run x benchmark (now includes agent_implementation column)
-    df_infos = pd.DataFrame(run_infos)
-    df_infos.to_csv("results/experiment_stationary_steps.csv", index=False)
-
     # --- Grouped Bar Plot for Average Stationary Time ---
-    # Filter for average rows
-    avg_df = df_infos[
-        df_infos["run"] == "avg"
-    ].copy()  # Use .copy() to avoid SettingWithCopyWarning
-
-    # Extract base variation name (remove the _agents or _agents_random suffix)
-    avg_df["variation"] = avg_df["experiment"].str.rsplit("_", n=1).str[0]
+    avg_df = pd.DataFrame(avg_infos)
 
     # Sort for consistent plotting order
     avg_df = avg_df.sort_values(by=["variation", "agent_implementation"])
 
-    plt.figure(figsize=(12, 2 * len(avg_df["variation"].unique())))
+    plt.figure(
+        figsize=(12, 2 * len(avg_df["variation"].unique())), layout="constrained"
+    )
     ax = sns.barplot(
         data=avg_df,
         y="variation",
@@ -394,12 +390,12 @@ if __name__ == "__main__":
         rotation=45,
     )  # Rotate x-labels for better readability
     plt.legend(title="Agent Implementation")
-    plt.tight_layout()
-    plt.savefig("results/avg_stationary_time_grouped_barplot.png")
+    plt.savefig("results/avg_stationary_time_grouped_barplot.png", dpi=SAVEFIG_DPI)
     plt.close()
     # --- End Grouped Bar Plot ---
 
     # Analyze and compare results
-    print("\nAnalyzing results...")
-    analyze_results(results)
+    if PLOT_RESULTS:
+        print("\nAnalyzing results...")
+        analyze_results(results)
     print("\nExperiment runs and analysis complete.")
@@ -2,72 +2,86 @@ import mesa
 from mesa.visualization import SolaraViz, make_plot_component, make_space_component
 
 from model import Environment
-from objects import COLORS_MAP
+from objects import COLORS_MAP, Waste, Zone
 
 print(f"Mesa version: {mesa.__version__}")
 # sns.set_theme(style="whitegrid")
 
 
-# Update agent_portrayal to use class names instead of isinstance and ensure portrayal is always initialized
+_WASTE_COLORS = {
+    0: "#00FF00",
+    1: "yellow",
+    2: "red",
+}
+_WASTE_MARKERS = {
+    0: "*",
+    1: "*",
+    2: "*",
+}
+_DRONE_COLORS = {
+    0: "#00FF00",
+    1: "#FFFF00",
+    2: "#FF0000",
+}
+
+# Portrayals only depend on a few small enumerations, so they are all built
+# once here and shared between calls (mesa copies the returned dict before use)
+_WASTE_PORTRAYALS = {
+    color: {
+        "marker": _WASTE_MARKERS[color],
+        "color": _WASTE_COLORS[color],
+        "zorder": 101,
+    }
+    for color in _WASTE_COLORS
+}
+_DEFAULT_WASTE_PORTRAYAL = {"marker": "o", "color": "black", "zorder": 101}
+_DRONE_PORTRAYALS = {
+    zone_type: {"color": color, "marker": "o", "zorder": 100}
+    for zone_type, color in _DRONE_COLORS.items()
+}
+_DEFAULT_DRONE_PORTRAYAL = {"color": "purple", "marker": "o", "zorder": 100}
+_ZONE_DROP_PORTRAYAL = {"marker": "s", "color": "#990000", "zorder": 99}
+_ZONE_WHITE_PORTRAYAL = {"marker": "s", "color": "white", "zorder": 99}
+_ZONE_BORDER_PORTRAYALS = {
+    zone_type: {"marker": "s", "color": color, "zorder": 99}
+    for zone_type, color in COLORS_MAP.items()
+}
+
+
+def _portray_waste(agent):
+    return _WASTE_PORTRAYALS.get(agent.waste_color, _DEFAULT_WASTE_PORTRAYAL)
+
+
+def _portray_drone(agent):
+    return _DRONE_PORTRAYALS.get(agent.zone_type, _DEFAULT_DRONE_PORTRAYAL)
+
+
+def _portray_zone(agent):
+    if agent.is_drop_zone:
+        return _ZONE_DROP_PORTRAYAL
+
+    # Color the columns highlighted as zone borders (baseline portrayal rule)
+    if agent.pos[0] in agent.model._zone_border_xs:
+        return _ZONE_BORDER_PORTRAYALS[agent.zone_type]
+    return _ZONE_WHITE_PORTRAYAL
+
+
+# Portrayal handler for each agent type, the drone class is added on first
+# use so that only the implementation selected for the model is imported
+_DISPATCH = {
+    Waste: _portray_waste,
+    Zone: _portray_zone,
+}
 
 
 def agent_portrayal(agent: mesa.Agent):
-    portrayal = {}  # Initialize portrayal to avoid UnboundLocalError
-
-    if agent.__class__.__name__ == "Waste":
-        WASTES_COLOR_MAP = {
-            0: "#00FF00",
-            1: "yellow",
-            2: "red",
-        }
-        WASTES_MARKER_MAP = {
-            0: "*",
-            1: "*",
-            2: "*",
-        }
-
-        portrayal = {
-            "marker": WASTES_MARKER_MAP.get(agent.waste_color, "o"),
-            "color": WASTES_COLOR_MAP.get(agent.waste_color, "black"),
-            "zorder": 101,
-        }
-    elif agent.__class__.__name__ == "Drone":
-        AGENT_COLOR_MAP = {
-            0: "#00FF00",
-            1: "#FFFF00",
-            2: "#FF0000",
-        }
-        portrayal = {
-            "color": AGENT_COLOR_MAP.get(agent.zone_type, "purple"),
-            "marker": "o",
-            "zorder": 100,
-        }
-    elif agent.__class__.__name__ == "Zone":
-        if agent.is_drop_zone:
-            portrayal = {
-                "marker": "s",
-                "color": "#990000",
-                "zorder": 99,
-            }
-        else:
-            if (
-                agent.pos[0] % (agent.model.grid.width // 3)
-                == agent.model.grid.width // 3 - 1
-                and agent.pos[0] < agent.model.grid.width // 3 * 2
-            ):
-                portrayal = {
-                    "marker": "s",
-                    "color": COLORS_MAP[agent.zone_type],
-                    "zorder": 99,
-                }
-            else:
-                portrayal = {
-                    "marker": "s",
-                    "color": "white",
-                    "zorder": 99,
-                }
-
-    return portrayal
+    agent_type = type(agent)
+    handler = _DISPATCH.get(agent_type)
+    if handler is None:
+        if agent_type is not agent.model.Drone:
+            return {}
+        handler = _DISPATCH[agent_type] = _portray_drone
+    return handler(agent)
 
 
 model_params = {
@@ -143,12 +157,6 @@ model_params = {
     },
 }
 
-selected_agent_module = model_params["agent_implementation"]["value"]
-if selected_agent_module == "agents_random":
-    pass
-else:
-    pass
-
 model = Environment(
     green_agents=model_params["green_agents"]["value"],
     yellow_agents=model_params["yellow_agents"]["value"],